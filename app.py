@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_from_directory, send_file, abort, Response, g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, timezone
 from functools import wraps
@@ -7,13 +7,73 @@ from werkzeug.utils import secure_filename
 import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import tempfile
+import atexit
+import bisect
+import copy
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+import gzip
+import hashlib
+import hmac
 import json
+import random
+import re
+import uuid
+import click
+from markupsafe import escape
 from urllib.parse import urlparse
-from PIL import Image
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.sql.elements import TextClause
+from collections import OrderedDict
+import sqlite3
+try:
+    import brotli
+except ImportError:  # 可选依赖，未安装时只提供 gzip 压缩版本
+    brotli = None
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，只能以单进程方式运行
+    fcntl = None
+import pytz
+import numpy as np
+from PIL import Image, features
 import io
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///teams.db'
+# 数据库地址，可通过环境变量指定（如基准测试使用临时数据库）
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('RMINTEL_DATABASE_URI', 'sqlite:///teams.db')
+
+# SQLite 并发设置：WAL 模式下读写互不阻塞；写锁冲突时最多等待 busy_timeout 毫秒，而不是直接报 "database is locked"
+SQLITE_JOURNAL_MODES = {'WAL', 'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY'}
+SQLITE_SYNCHRONOUS_MODES = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+app.config['SQLITE_JOURNAL_MODE'] = os.getenv('RMINTEL_SQLITE_JOURNAL_MODE', 'WAL').upper()
+app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.getenv('RMINTEL_SQLITE_BUSY_TIMEOUT_MS', '5000'))
+# WAL 模式下 NORMAL 只在检查点时 fsync，断电最多丢失最近的事务，不会损坏数据库
+app.config['SQLITE_SYNCHRONOUS'] = os.getenv('RMINTEL_SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+if app.config['SQLITE_JOURNAL_MODE'] not in SQLITE_JOURNAL_MODES:
+    raise ValueError(f"不支持的 SQLite journal_mode: {app.config['SQLITE_JOURNAL_MODE']}")
+if app.config['SQLITE_SYNCHRONOUS'] not in SQLITE_SYNCHRONOUS_MODES:
+    raise ValueError(f"不支持的 SQLite synchronous: {app.config['SQLITE_SYNCHRONOUS']}")
+if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite:///'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        # 连接可在线程间复用（由连接池保证同一时刻只有一个线程使用）
+        'connect_args': {
+            'timeout': app.config['SQLITE_BUSY_TIMEOUT_MS'] / 1000,
+            'check_same_thread': False,
+        },
+        'pool_size': int(os.getenv('RMINTEL_DB_POOL_SIZE', '10')),
+        'max_overflow': int(os.getenv('RMINTEL_DB_MAX_OVERFLOW', '20')),
+        'pool_timeout': 30,
+    }
 app.config['SECRET_KEY'] = 'your-secret-key-keep-it-safe'
 
 # 配置文件上传
@@ -21,12 +81,14 @@ UPLOAD_FOLDER = 'static/uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 限制上传文件大小为16MB
+# 批量上传一次可能包含几十张照片，只对该接口放宽请求体大小；其中每个文件仍受上面的16MB限制
+BATCH_UPLOAD_MAX_CONTENT_LENGTH = 256 * 1024 * 1024
 
 # 确保上传目录存在
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# 确保数据目录存在
-DATA_FOLDER = 'static/data'
+# 确保数据目录存在（可通过环境变量指定，如基准测试使用生成的数据）
+DATA_FOLDER = os.getenv('RMINTEL_DATA_FOLDER', 'static/data')
 os.makedirs(DATA_FOLDER, exist_ok=True)
 
 # 创建存储学校 logo 的目录
@@ -40,65 +102,1236 @@ REPLAY_DATA_FILE = os.path.join(DATA_FOLDER, 'simple_cms.json')
 # 添加积分榜数据文件路径
 GROUP_RANK_FILE = os.path.join(DATA_FOLDER, 'group_rank_info.json')
 
-# 下载机器人数据的函数
-def download_robot_data():
+# 比赛时间统一显示为北京时间
+BEIJING_TZ = pytz.timezone('Asia/Shanghai')
+
+# 日志：各模块使用 rmintel.* 下的记录器；记录先放入队列，由后台线程统一格式化并写出，请求线程不做控制台 I/O
+LOG_LEVEL = os.getenv('RMINTEL_LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('RMINTEL_LOG_FORMAT', 'json')  # json 或 text
+# 同一条日志模板每个时间窗口内最多输出的条数，超出的只计数（防止逐条循环中的日志刷屏），0 表示不限制
+LOG_RATE_LIMIT = int(os.getenv('RMINTEL_LOG_RATE_LIMIT', '20'))
+LOG_RATE_WINDOW_SECONDS = 60
+
+class JsonLogFormatter(logging.Formatter):
+    """每条日志输出为一行 JSON；通过 extra 传入的字段原样作为结构化字段输出"""
+    RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'pid': record.process,
+        }
+        for key, value in vars(record).items():
+            if key not in self.RESERVED:
+                entry[key] = value
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class RateLimitFilter(logging.Filter):
+    """
+    同一记录器的同一日志模板（record.msg，参数不计）每个窗口最多输出 limit 条，
+    超出的丢弃并计数，计数附在下一个窗口的第一条日志上（suppressed 字段）。
+    """
+
+    def __init__(self, limit, window):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        self._windows = {}  # (记录器, 模板) -> [窗口开始时间, 已输出条数, 已丢弃条数]
+
+    def filter(self, record):
+        if self.limit <= 0:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                if state is not None and state[2]:
+                    record.suppressed = state[2]
+                if len(self._windows) > 1000:
+                    self._windows = {k: v for k, v in self._windows.items() if now - v[0] < self.window}
+                self._windows[key] = [now, 1, 0]
+                return True
+            if state[1] < self.limit:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+class LogQueueHandler(QueueHandler):
+    """放入队列前只合并参数并展开异常信息，格式化与写出都在后台线程中完成；首次写日志时才启动后台线程"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if _log_listener is None:
+            start_log_listener()
+        self.queue.put_nowait(record)
+
+_log_listener = None
+_log_listener_lock = threading.Lock()
+log_handler = LogQueueHandler(queue.SimpleQueue())
+log_handler.addFilter(RateLimitFilter(LOG_RATE_LIMIT, LOG_RATE_WINDOW_SECONDS))
+logging.getLogger('rmintel').addHandler(log_handler)
+logging.getLogger('rmintel').setLevel(LOG_LEVEL)
+logging.getLogger('rmintel').propagate = False
+
+def start_log_listener():
+    """启动写出日志的后台线程（只启动一次），进程退出时写完队列中剩余的日志"""
+    global _log_listener
+    with _log_listener_lock:
+        if _log_listener is not None:
+            return
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(JsonLogFormatter() if LOG_FORMAT == 'json'
+                            else logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        _log_listener = QueueListener(log_handler.queue, output)
+        _log_listener.start()
+
+def stop_log_listener():
+    global _log_listener
+    with _log_listener_lock:
+        if _log_listener is not None:
+            _log_listener.stop()
+            _log_listener = None
+
+atexit.register(stop_log_listener)
+
+def reset_log_listener_after_fork():
+    # fork 出的子进程（如 gunicorn 工作进程）没有父进程的写出线程，换用新队列，下次写日志时重新启动
+    global _log_listener, _log_listener_lock
+    _log_listener = None
+    _log_listener_lock = threading.Lock()
+    log_handler.queue = queue.SimpleQueue()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_log_listener_after_fork)
+
+app_log = logging.getLogger('rmintel.app')
+db_log = logging.getLogger('rmintel.db')
+feed_log = logging.getLogger('rmintel.feeds')
+logo_log = logging.getLogger('rmintel.logos')
+image_log = logging.getLogger('rmintel.images')
+schedule_log = logging.getLogger('rmintel.schedule')
+ranking_log = logging.getLogger('rmintel.ranking')
+history_log = logging.getLogger('rmintel.history')
+team_log = logging.getLogger('rmintel.teams')
+
+class Metrics:
+    """
+    进程内的性能指标（计数器、仪表与直方图），由 /metrics 以 Prometheus 文本格式输出。
+    多进程部署时每个工作进程各自统计，由 Prometheus 按实例汇总。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}    # name -> (type, help, buckets)
+        self._values = {}  # name -> {labels: 数值，直方图为 [各区间计数, 总和, 次数]}
+
+    def _register(self, kind, name, help_text, buckets=None):
+        self._meta[name] = (kind, help_text, tuple(buckets) if buckets else None)
+        self._values[name] = {}
+
+    def counter(self, name, help_text):
+        self._register('counter', name, help_text)
+
+    def gauge(self, name, help_text):
+        self._register('gauge', name, help_text)
+
+    def histogram(self, name, help_text, buckets):
+        self._register('histogram', name, help_text, buckets)
+
+    def inc(self, name, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            values = self._values[name]
+            values[key] = values.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[name][key] = value
+
+    def observe(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        buckets = self._meta[name][2]
+        with self._lock:
+            entry = self._values[name].get(key)
+            if entry is None:
+                entry = self._values[name][key] = [[0] * len(buckets), 0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ''
+        escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+        return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+    @staticmethod
+    def _format_number(value):
+        return repr(value) if isinstance(value, float) else str(value)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, buckets) in self._meta.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in sorted(self._values[name].items()):
+                    if kind != 'histogram':
+                        lines.append(f'{name}{self._format_labels(labels)} {self._format_number(value)}')
+                        continue
+                    counts, total, count = value
+                    cumulative = 0
+                    for bound, bucket_count in zip(buckets, counts):
+                        cumulative += bucket_count
+                        lines.append(f'{name}_bucket{self._format_labels(labels, [("le", self._format_number(float(bound)))])} {cumulative}')
+                    lines.append(f'{name}_bucket{self._format_labels(labels, [("le", "+Inf")])} {count}')
+                    lines.append(f'{name}_sum{self._format_labels(labels)} {self._format_number(float(total))}')
+                    lines.append(f'{name}_count{self._format_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
+metrics.histogram('rmintel_http_request_duration_seconds', '请求处理耗时（秒）',
+                  [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10])
+metrics.counter('rmintel_http_requests_total', '请求数')
+metrics.histogram('rmintel_db_queries_per_request', '每个请求执行的 SQL 语句数',
+                  [0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500])
+metrics.counter('rmintel_db_queries_total', 'SQL 语句数（请求之外的后台任务记为 background）')
+metrics.counter('rmintel_db_query_seconds_total', 'SQL 语句执行总耗时（秒）')
+metrics.histogram('rmintel_feed_fetch_duration_seconds', '数据源下载耗时（秒，含响应体）',
+                  [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30])
+metrics.histogram('rmintel_feed_parse_duration_seconds', '数据源解析与预处理耗时（秒）',
+                  [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5])
+metrics.counter('rmintel_feed_downloads_total', '数据源下载次数（result 为 updated / not_modified / error）')
+metrics.counter('rmintel_feed_bytes_total', '数据源下载字节数')
+metrics.gauge('rmintel_feed_last_success_timestamp_seconds', '数据源最近一次下载成功的时间（Unix 时间戳）')
+metrics.counter('rmintel_feed_cache_hits_total', '数据源缓存命中次数')
+metrics.counter('rmintel_feed_cache_misses_total', '数据源缓存未命中（重新加载）次数')
+metrics.counter('rmintel_page_cache_hits_total', '页面缓存命中次数')
+metrics.counter('rmintel_page_cache_misses_total', '页面缓存未命中次数')
+metrics.gauge('rmintel_page_cache_bytes', '页面缓存占用字节数')
+
+# 数据源缓存：按文件签名缓存解析（及预处理）后的结构，避免每次请求重复 json.load
+class FeedCache:
+    """
+    进程内的数据源缓存。
+    每个文件注册一个加载函数（原始 JSON -> 预处理后的结构），
+    通过 (mtime, size, inode) 签名判断文件是否变化，变化时重新加载并整体替换。
+    版本号只在本进程内有效，需要跨进程比较时使用 feed_file_digest()。
+    缓存中的结构在多个请求间共享，调用方只能读取，不能修改。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaders = {}
+        self._entries = {}  # path -> {'signature', 'version', 'data'}
+        # 命中/未命中计数单独加锁：读写字典的 += 不是原子操作，而主锁在重新加载大文件时会被长时间持有
+        self._count_lock = threading.Lock()
+        self._hits = {}
+        self._misses = {}
+        self._derived = {}  # (path, builder) -> (version, result)
+
+    def register(self, path, loader=None):
+        self._loaders[path] = loader or (lambda raw: raw)
+        self._hits.setdefault(path, 0)
+        self._misses.setdefault(path, 0)
+
+    @staticmethod
+    def _signature(path):
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def get(self, path):
+        """返回文件对应的预处理数据；文件不存在时抛出 FileNotFoundError"""
+        signature = self._signature(path)
+        entry = self._entries.get(path)
+        if entry is not None and entry['signature'] == signature:
+            self._count(self._hits, path)
+            return entry['data']
+
+        with self._lock:
+            # 可能已被其他线程加载
+            entry = self._entries.get(path)
+            if entry is not None and entry['signature'] == signature:
+                self._count(self._hits, path)
+                return entry['data']
+
+            self._count(self._misses, path)
+            with open(path, 'rb') as f:
+                content = f.read()
+            try:
+                data = self.parse(path, content)
+            except ValueError as e:
+                # 文件内容不完整（如正在写入），继续使用旧数据；
+                # 记下这个签名，文件再次变化之前不再重复读取和解析
+                if entry is None:
+                    raise
+                feed_log.warning('解析 %s 失败，继续使用缓存数据: %s', path, e)
+                self._entries[path] = dict(entry, signature=signature)
+                return entry['data']
+            self._install(path, data, signature)
+            return data
+
+    def _count(self, counters, path):
+        with self._count_lock:
+            counters[path] += 1
+
+    def parse(self, path, content):
+        """用文件的加载函数解析内容（不修改缓存）；内容不是合法 JSON 或结构不符时抛出 ValueError"""
+        start = time.perf_counter()
+        try:
+            data = self._loaders[path](json.loads(content))
+        except (KeyError, IndexError, TypeError, AttributeError) as e:
+            raise ValueError(f'数据结构不符合预期: {e!r}') from e
+        metrics.observe('rmintel_feed_parse_duration_seconds', time.perf_counter() - start,
+                        feed=os.path.splitext(os.path.basename(path))[0])
+        return data
+
+    def install(self, path, data):
+        """文件写入后直接换上已解析的数据，读者只会看到旧数据或新数据"""
+        with self._lock:
+            self._install(path, data, self._signature(path))
+
+    def _install(self, path, data, signature):
+        previous = self._entries.get(path)
+        self._entries[path] = {
+            'signature': signature,
+            'version': (previous['version'] + 1) if previous else 1,
+            'data': data,
+        }
+
+    def derive(self, path, builder):
+        """返回由文件数据构建的派生结构（如排名表），每个文件版本只构建一次"""
+        data = self.get(path)
+        version = self.version(path)
+        key = (path, builder)
+        cached = self._derived.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        result = builder(data)
+        self._derived[key] = (version, result)
+        return result
+
+    def version(self, path):
+        """返回当前缓存数据的版本号，未加载时为0"""
+        entry = self._entries.get(path)
+        return entry['version'] if entry else 0
+
+    def stats(self):
+        return {
+            os.path.basename(path): {
+                'hits': self._hits[path],
+                'misses': self._misses[path],
+                'version': self.version(path),
+            }
+            for path in self._loaders
+        }
+
+# 解析回放数据：比赛ID -> 回放链接
+def parse_replay_links(replay_json):
+    replay_links = {}
+    for item in replay_json.get('simple_cms', []) or []:
+        if item.get('is_active', False):
+            content = item.get('content') or {}
+            main_remote_url = content.get('main_remote_url', '')
+            # 使用content中的match_id作为键，这个id应与比赛id匹配
+            match_id = str(content.get('match_id', ''))
+            if match_id and main_remote_url:
+                replay_links[match_id] = main_remote_url
+    return replay_links
+
+# 解析赛程数据：赛事标题 + 所有比赛（小组赛与淘汰赛）
+def parse_schedule(schedule_json):
+    title = '未知赛事'
+    all_matches = []
+    event = (schedule_json.get('data') or {}).get('event') or {}
+    if 'zones' in event:
+        title = event.get('title', '未知赛事')
+        # 确保zones不是None，且安全地获取nodes
+        zones_data = event['zones']
+        zones = zones_data.get('nodes', []) if zones_data is not None else []
+        for zone in zones:
+            # 获取小组赛 - 确保安全访问
+            group_matches = zone.get('groupMatches', {})
+            if group_matches is not None:
+                all_matches.extend(group_matches.get('nodes', []))
+            # 获取淘汰赛 - 确保安全访问
+            knockout_matches = zone.get('knockoutMatches', {})
+            if knockout_matches is not None:
+                all_matches.extend(knockout_matches.get('nodes', []))
+    return {'title': title, 'matches': all_matches}
+
+# 积分榜项目名 -> 记录字段
+STANDING_ITEMS = {
+    '胜场数': 'wins',
+    '对手分': 'opponent_score',
+    '局均总基地净胜血量': 'base_hp_diff',
+    '局均总前哨站净胜血量': 'outpost_hp_diff',
+    '局均全队总伤害血量': 'total_damage',
+}
+
+def parse_number(value):
+    """积分榜数值统一为 int 或 float，无法解析时为 0"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
     try:
-        # 从DJI API下载数据
-        response = requests.get('https://rm-static.djicdn.com/live_json/robot_data.json', timeout=10)
-        response.raise_for_status()  # 如果请求失败，抛出异常
-        
-        # 保存数据到本地文件
-        with open(ROBOT_DATA_FILE, 'wb') as f:
-            f.write(response.content)
-        
-        print(f"[{datetime.now()}] 成功下载机器人数据")
-
-        # 从DJI API下载赛程数据
-        schedule_response = requests.get('https://rm-static.djicdn.com/live_json/schedule.json', timeout=10)
-        schedule_response.raise_for_status()  # 如果请求失败，抛出异常
-        with open(SCHEDULE_DATA_FILE, 'wb') as f:
-            f.write(schedule_response.content)
-        print(f"[{datetime.now()}] 成功下载赛程数据")
-        
-        # 从DJI API下载回放数据
-        replay_response = requests.get('https://rm-static.djicdn.com/live_json/simple_cms.json', timeout=10)
-        replay_response.raise_for_status()
-        with open(REPLAY_DATA_FILE, 'wb') as f:
-            f.write(replay_response.content)
-        print(f"[{datetime.now()}] 成功下载回放数据")
-        
-        # 添加积分榜数据下载
-        rank_response = requests.get('https://rm-static.djicdn.com/live_json/group_rank_info.json', timeout=10)
-        rank_response.raise_for_status()
-        with open(GROUP_RANK_FILE, 'wb') as f:
-            f.write(rank_response.content)
-        print(f"[{datetime.now()}] 成功下载积分榜数据")
-        
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0
+    return int(number) if number.is_integer() else number
+
+# 小组内排序：胜场数、负场数（越少越靠前）、对手分、局均总基地净胜血量、局均总前哨站净胜血量、局均全队总伤害血量
+def standing_sort_key(team):
+    return (team['wins'], -team['losses'], team['opponent_score'],
+            team['base_hp_diff'], team['outpost_hp_diff'], team['total_damage'])
+
+# 解析积分榜数据：赛区 -> 小组 -> 排好序的队伍记录（数值字段均已转换为数字）
+def parse_group_rank(rank_data):
+    zones_data = []
+
+    for zone in rank_data.get('zones', []):
+        zone_info = {
+            'name': zone.get('zoneName', '未知赛区'),
+            'groups': []
+        }
+
+        for group in zone.get('groups', []):
+            group_info = {
+                'name': group.get('groupName', '未知小组'),
+                'teams': []
+            }
+            # 获取队伍信息
+            teams = []
+            for player in group.get('groupPlayers', []):
+                if not player:
+                    continue
+                team = {
+                    'zone': zone_info['name'],
+                    'group': group_info['name'],
+                    'collegeName': '未知学校',
+                    'teamName': '未知战队',
+                    'collegeLogo': '',
+                    'record': '',
+                    'wins': 0,
+                    'draws': 0,
+                    'losses': 0,
+                    'opponent_score': 0,
+                    'base_hp_diff': 0,
+                    'outpost_hp_diff': 0,
+                    'total_damage': 0,
+                }
+                # 从项目中提取数据
+                for item in player:
+                    item_name = item.get('itemName', '')
+                    item_value = item.get('itemValue', '')
+
+                    if item_name == '战队':
+                        team['collegeName'] = item_value.get('collegeName', '未知学校')
+                        team['teamName'] = item_value.get('teamName', '未知战队')
+                        team['collegeLogo'] = item_value.get('collegeLogo', '')
+                    elif item_name == '胜/平/负':
+                        team['record'] = item_value
+                        # 从胜/平/负中提取平局与负场数
+                        parts = item_value.split('/') if isinstance(item_value, str) else []
+                        if len(parts) == 3:
+                            team['draws'] = parse_number(parts[1])
+                            team['losses'] = parse_number(parts[2])
+                    elif item_name in STANDING_ITEMS:
+                        team[STANDING_ITEMS[item_name]] = parse_number(item_value)
+                teams.append(team)
+
+            teams.sort(key=standing_sort_key, reverse=True)
+            for position, team in enumerate(teams, 1):
+                team['group_rank'] = position
+
+            group_info['teams'] = teams
+            zone_info['groups'].append(group_info)
+
+        zones_data.append(zone_info)
+
+    return zones_data
+
+# 全局排行榜可排序的指标；默认降序（越大越靠前），负场数默认升序
+LEADERBOARD_METRICS = ['wins', 'losses', 'draws', 'opponent_score', 'base_hp_diff', 'outpost_hp_diff', 'total_damage']
+LEADERBOARD_ASCENDING = {'losses'}
+
+# 由积分榜构建全局排行榜：所有队伍的记录，以及每个指标两个方向预先排好的下标
+def build_leaderboard(zones_data):
+    records = [team for zone in zones_data for group in zone['groups'] for team in group['teams']]
+    columns = {metric: np.array([team[metric] for team in records], dtype=np.float64)
+               for metric in LEADERBOARD_METRICS}
+    # 先按小组排名规则得到全局顺序，各指标的排序在此基础上稳定排序，相同取值时按小组排名规则决胜
+    base_order = np.array(sorted(range(len(records)), key=lambda i: standing_sort_key(records[i]), reverse=True),
+                          dtype=np.int64)
+    orders = {}
+    for metric, values in columns.items():
+        values = values[base_order]
+        orders[(metric, 'desc')] = base_order[np.argsort(-values, kind='stable')]
+        orders[(metric, 'asc')] = base_order[np.argsort(values, kind='stable')]
+    return {'records': records, 'orders': orders}
+
+# 学校 -> 积分榜记录（同名学校只取第一次出现的队伍）
+def build_standing_index(zones_data):
+    index = {}
+    for zone in zones_data:
+        for group in zone['groups']:
+            for team in group['teams']:
+                index.setdefault(team['collegeName'], dict(team, group_size=len(group['teams'])))
+    return index
+
+feed_cache = FeedCache()
+feed_cache.register(ROBOT_DATA_FILE)
+feed_cache.register(SCHEDULE_DATA_FILE, parse_schedule)
+feed_cache.register(REPLAY_DATA_FILE, parse_replay_links)
+feed_cache.register(GROUP_RANK_FILE, parse_group_rank)
+
+# 页面数据版本文件：队伍/战术数据写入或数据源更新时整体替换，文件签名即为版本号（多进程共享）
+DATA_VERSION_FILE = os.path.join(app.instance_path, 'data_version')
+
+def data_version():
+    try:
+        return FeedCache._signature(DATA_VERSION_FILE)
+    except FileNotFoundError:
+        return None
+
+def bump_data_version():
+    """替换版本文件使其签名变化；缓存只需要版本变化，不需要 fsync"""
+    os.makedirs(app.instance_path, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=app.instance_path, prefix='.data_version.', suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        f.write(str(time.time_ns()))
+    os.replace(tmp_path, DATA_VERSION_FILE)
+
+# 渲染结果缓存：按 (页面, 数据版本) 缓存渲染好的 HTML，LRU 淘汰，限制条目数与总大小
+class PageCache:
+    """
+    进程内的页面渲染缓存，保存 gzip 压缩后的页面（HTML 压缩率通常在 10 倍以上，大页面也能放入缓存）。
+    键中包含数据版本，版本变化后旧条目不会再被命中，最终由 LRU 淘汰。
+    """
+
+    def __init__(self, max_entries=64, max_bytes=32 * 1024 * 1024):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> bytes
+        self._bytes = 0
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = body
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else None,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'evictions': self.evictions,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+        }
+
+page_cache = PageCache(
+    max_entries=int(os.getenv('RMINTEL_PAGE_CACHE_ENTRIES', '64')),
+    max_bytes=int(os.getenv('RMINTEL_PAGE_CACHE_MAX_MB', '32')) * 1024 * 1024,
+)
+
+# 页面缓存的 gzip 压缩级别：6 在压缩率与渲染后压缩耗时之间较为均衡
+PAGE_CACHE_GZIP_LEVEL = 6
+
+def cached_page(name, render, *extra_key):
+    """
+    返回缓存的页面，未命中时调用 render() 渲染并缓存。
+    必须在查询数据之前读取版本号：渲染期间发生的写入会让版本变化，旧版本下缓存的内容不会再被使用。
+    客户端支持 gzip 时直接发送缓存中的压缩内容，否则解压后发送。
+    """
+    key = (name, data_version()) + extra_key
+    compressed = page_cache.get(key)
+    body = None
+    if compressed is None:
+        body = render().encode('utf-8')
+        compressed = gzip.compress(body, compresslevel=PAGE_CACHE_GZIP_LEVEL, mtime=0)
+        page_cache.put(key, compressed)
+    
+    if request.accept_encodings.best_match(['gzip']):
+        response = Response(compressed, mimetype='text/html')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(body if body is not None else gzip.decompress(compressed), mimetype='text/html')
+    response.vary.add('Accept-Encoding')
+    return response
+
+# 机器人指标排名：与 view_team 页面展示的字段一致
+ROBOT_METRIC_FIELDS = [
+    'eaSmallHitRate', 'eagHurt', 'eaKDA', 'eagKdaScore', 'gkDamage', 'gKillCount',
+    'eaBigHitRate', 'eaSnipeCnt', 'etDartOutpostCnt', 'etDartFixedCnt', 'etDartRDFixCnt',
+    'etDartRDMoveCnt', 'eaRadarMarkerTime', 'eaRadarDebuffDmg', 'eaExchangeEcon',
+    'avgMineTime', 'avgMineDiff',
+]
+# 越小越好的指标
+ASCENDING_METRICS = {'avgMineTime'}
+
+def kda_score(kda):
+    """将 "击杀/死亡/助攻" 字符串换算为KDA得分，三项都接近0时返回None"""
+    if not kda or not isinstance(kda, str):
+        return None
+    parts = kda.split('/')
+    if len(parts) != 3:
+        return None
+    try:
+        kills, deaths, assists = (float(p) for p in parts)
+    except ValueError:
+        return None
+    if kills < 0.1 and deaths < 0.1 and assists < 0.1:
+        return None
+    return (kills + assists) / max(1, deaths)
+
+def build_robot_rankings(robot_data):
+    """
+    按机器人类型计算每个指标的排名。
+    值为0（或缺失）的指标不参与排名，KDA按 (击杀+助攻)/max(1,死亡) 计算。
+    结果按类型保存排名矩阵，并建立学校 -> 机器人位置的索引。
+    """
+    robots_by_type = {}
+    colleges = {}
+    for zone in robot_data.get('zones', []):
+        for team in zone.get('teams', []):
+            college_name = team.get('collegeName', '')
+            # 同名学校只取第一次出现的队伍
+            entry = colleges.get(college_name)
+            if entry is None:
+                entry = colleges[college_name] = {'team': team, 'robots': []}
+            for robot in team.get('robots', []):
+                rows = robots_by_type.setdefault(robot.get('type'), [])
+                if entry['team'] is team:
+                    entry['robots'].append((robot.get('type'), len(rows)))
+                rows.append(robot)
+
+    tables = {}
+    for robot_type, robots in robots_by_type.items():
+        values = np.full((len(robots), len(ROBOT_METRIC_FIELDS)), np.nan)
+        for i, robot in enumerate(robots):
+            for j, field in enumerate(ROBOT_METRIC_FIELDS):
+                if field == 'eaKDA':
+                    # KDA得分为0也参与排名，只跳过三项都接近0的数据
+                    value = kda_score(robot.get(field))
+                    if value is not None:
+                        values[i, j] = value
+                else:
+                    value = robot.get(field)
+                    if isinstance(value, (int, float)) and value != 0:
+                        values[i, j] = value
+
+        ranks = np.zeros(values.shape, dtype=np.int32)
+        totals = np.zeros(len(ROBOT_METRIC_FIELDS), dtype=np.int32)
+        for j, field in enumerate(ROBOT_METRIC_FIELDS):
+            column = values[:, j]
+            present = np.flatnonzero(~np.isnan(column))
+            if present.size == 0:
+                continue
+            keys = column[present] if field in ASCENDING_METRICS else -column[present]
+            # 稳定排序：值相同的机器人保持数据源中的先后顺序
+            order = present[np.argsort(keys, kind='stable')]
+            ranks[order, j] = np.arange(1, order.size + 1)
+            totals[j] = order.size
+        tables[robot_type] = {'robots': robots, 'ranks': ranks, 'totals': totals}
+
+    return {'tables': tables, 'colleges': colleges}
+
+def get_college_robot_rankings(college_name):
+    """返回某个学校的机器人数据及各指标排名（不存在时 team 为 None）"""
+    rankings = feed_cache.derive(ROBOT_DATA_FILE, build_robot_rankings)
+    result = {
+        'version': feed_cache.version(ROBOT_DATA_FILE),
+        'robot_types': list(rankings['tables'].keys()),
+        'team': None,
+        'robots': [],
+    }
+    entry = rankings['colleges'].get(college_name)
+    if entry is None:
+        return result
+
+    team = entry['team']
+    result['team'] = {
+        'id': team.get('id'),
+        'name': team.get('name', ''),
+        'collegeName': team.get('collegeName', ''),
+        'collegeLogo': team.get('collegeLogo', ''),
+    }
+    for robot_type, row in entry['robots']:
+        table = rankings['tables'][robot_type]
+        robot = dict(table['robots'][row])
+        robot['ranks'] = {}
+        for j, field in enumerate(ROBOT_METRIC_FIELDS):
+            rank = int(table['ranks'][row, j])
+            if rank:
+                total = int(table['totals'][j])
+                robot['ranks'][field] = {
+                    'rank': rank,
+                    'total': total,
+                    'percentile': round(100.0 * (total - rank + 1) / total, 1),
+                }
+        result['robots'].append(robot)
+    return result
+
+# 官方数据源：(名称, URL, 本地文件, 描述)
+FEEDS = [
+    ('robot_data', 'https://rm-static.djicdn.com/live_json/robot_data.json', ROBOT_DATA_FILE, '机器人数据'),
+    ('schedule', 'https://rm-static.djicdn.com/live_json/schedule.json', SCHEDULE_DATA_FILE, '赛程数据'),
+    ('simple_cms', 'https://rm-static.djicdn.com/live_json/simple_cms.json', REPLAY_DATA_FILE, '回放数据'),
+    ('group_rank_info', 'https://rm-static.djicdn.com/live_json/group_rank_info.json', GROUP_RANK_FILE, '积分榜数据'),
+]
+
+# 所有下载共用一个连接池
+http_session = requests.Session()
+http_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+http_session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# 每个数据源的缓存校验信息（ETag / Last-Modified）和最近一次下载结果
+feed_validators = {}
+feed_download_stats = {}
+
+# 先写入临时文件再原子替换，读者不会看到写了一半的文件
+def atomic_write(path, content):
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# 保存下载的数据源文件并刷新缓存：先解析校验，内容无法解析时抛出 ValueError，保留原文件与缓存
+def save_feed(path, content):
+    data = feed_cache.parse(path, content)
+    atomic_write(path, content)
+    write_feed_variants(path, content)
+    feed_cache.install(path, data)
+    bump_data_version()
+
+# 数据源文件的压缩版本：(Content-Encoding, 文件后缀, 压缩函数)，按优先顺序排列
+FEED_ENCODINGS = [('gzip', '.gz', lambda content: gzip.compress(content, compresslevel=9, mtime=0))]
+if brotli is not None:
+    FEED_ENCODINGS.insert(0, ('br', '.br', lambda content: brotli.compress(content, quality=11)))
+
+def write_feed_variants(path, content):
+    """写入数据源文件的压缩版本，供 serve_feed_file 直接发送"""
+    for _, suffix, compress in FEED_ENCODINGS:
+        atomic_write(path + suffix, compress(content))
+
+# 对外提供的数据源文件：path -> {signature, etag, variants}
+served_feed_index = {}
+_served_feed_lock = threading.Lock()
+
+def get_served_feed(path):
+    """返回文件的内容哈希与各压缩版本路径；源文件变化（包括其他进程下载）时重新计算，并补齐过期的压缩版本"""
+    signature = FeedCache._signature(path)
+    entry = served_feed_index.get(path)
+    if entry is not None and entry['signature'] == signature:
+        return entry
+    with _served_feed_lock:
+        entry = served_feed_index.get(path)
+        if entry is not None and entry['signature'] == signature:
+            return entry
+        with open(path, 'rb') as f:
+            content = f.read()
+        variants = {}
+        for encoding, suffix, compress in FEED_ENCODINGS:
+            variant_path = path + suffix
+            if not os.path.exists(variant_path) or os.stat(variant_path).st_mtime_ns < signature[0]:
+                atomic_write(variant_path, compress(content))
+            variants[encoding] = variant_path
+        variants['identity'] = path
+        entry = {'signature': signature, 'etag': hashlib.sha256(content).hexdigest(), 'variants': variants}
+        served_feed_index[path] = entry
+        return entry
+
+# 按 Accept-Encoding 发送预先压缩好的数据源文件，ETag 为内容哈希，支持 304
+def serve_feed_file(path):
+    if not os.path.exists(path):
+        abort(404)
+    entry = get_served_feed(path)
+    encoding = request.accept_encodings.best_match(list(entry['variants'])) or 'identity'
+    response = send_file(os.path.abspath(entry['variants'][encoding]), mimetype='application/json',
+                         etag=f"{entry['etag']}-{encoding}", conditional=True, max_age=0)
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    # 数据随时可能更新，每次使用前都要重新校验
+    response.cache_control.no_cache = True
+    return response
+
+# 将刚下载的 robot_data.json 追加到机器人指标历史，失败不影响下载结果
+def record_robot_snapshot(taken_at=None):
+    try:
+        with app.app_context():
+            append_robot_snapshot(feed_cache.get(ROBOT_DATA_FILE), taken_at)
+    except Exception as e:
+        history_log.exception('记录机器人数据快照失败: %s', e)
+
+# 下载单个数据源，返回本次下载的状态、字节数与耗时
+def download_feed(name, url, path, label):
+    headers = {}
+    validators = feed_validators.get(name, {})
+    # 本地文件存在时才发送条件请求
+    if os.path.exists(path):
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+    result = {'feed': name, 'status': None, 'bytes': 0, 'latency_ms': None, 'updated': False,
+              'error': None, 'finished_at': None}
+    start = time.perf_counter()
+    try:
+        response = http_session.get(url, headers=headers, timeout=10)
+        metrics.observe('rmintel_feed_fetch_duration_seconds', time.perf_counter() - start, feed=name)
+        result['status'] = response.status_code
+        if response.status_code == 304:
+            metrics.inc('rmintel_feed_downloads_total', feed=name, result='not_modified')
+            metrics.set('rmintel_feed_last_success_timestamp_seconds', time.time(), feed=name)
+            feed_log.info('%s未变化，跳过', label, extra={'feed': name})
+        else:
+            response.raise_for_status()  # 如果请求失败，抛出异常
+            metrics.inc('rmintel_feed_bytes_total', len(response.content), feed=name)
+            save_feed(path, response.content)
+            if path == ROBOT_DATA_FILE:
+                record_robot_snapshot()
+            result['bytes'] = len(response.content)
+            result['updated'] = True
+            feed_validators[name] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+            metrics.inc('rmintel_feed_downloads_total', feed=name, result='updated')
+            metrics.set('rmintel_feed_last_success_timestamp_seconds', time.time(), feed=name)
+            feed_log.info('成功下载%s', label, extra={'feed': name, 'bytes': result['bytes']})
     except Exception as e:
-        print(f"[{datetime.now()}] 下载数据失败: {str(e)}")
+        result['error'] = str(e)
+        metrics.inc('rmintel_feed_downloads_total', feed=name, result='error')
+        feed_log.error('下载%s失败: %s', label, e, extra={'feed': name})
+    result['latency_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    result['finished_at'] = datetime.now(timezone.utc).isoformat()
+    feed_download_stats[name] = result
+    return result
+
+# 每个数据源同时只有一个下载在进行：进程内用线程锁，多进程之间用文件锁
+FEED_LOCK_FOLDER = os.path.join(app.instance_path, 'feed_locks')
+_feed_fetch_locks = {feed[0]: threading.Lock() for feed in FEEDS}
+
+def fetch_feed(feed):
+    """
+    单飞下载一个数据源：已有同一数据源的下载在进行时不再发起请求，
+    而是等待其完成并返回 coalesced=True 的结果（数据文件已被原子替换，读取时会拿到新数据）。
+    """
+    name = feed[0]
+    lock = _feed_fetch_locks[name]
+    if not lock.acquire(blocking=False):
+        with lock:
+            pass
+        return dict(feed_download_stats.get(name) or {'feed': name, 'error': None}, coalesced=True)
+    lock_file = None
+    try:
+        if fcntl is not None:
+            os.makedirs(FEED_LOCK_FOLDER, exist_ok=True)
+            lock_file = open(os.path.join(FEED_LOCK_FOLDER, f'{name}.lock'), 'a')
+            if not try_lock_file(lock_file):
+                # 其他进程正在下载同一数据源
+                try_lock_file(lock_file, blocking=True)
+                return {'feed': name, 'error': None, 'coalesced': True,
+                        'finished_at': datetime.now(timezone.utc).isoformat()}
+        return download_feed(*feed)
+    finally:
+        if lock_file is not None:
+            lock_file.close()
+        lock.release()
+
+# 下载机器人数据的函数：并行下载所有数据源，单个数据源失败不影响其他数据源
+def download_robot_data(feeds=FEEDS):
+    with ThreadPoolExecutor(max_workers=len(feeds)) as executor:
+        return list(executor.map(fetch_feed, feeds))
+
+# 数据源轮询间隔（秒）：(比赛进行中或即将开始时, 空闲时)
+FEED_POLL_INTERVALS = {
+    'robot_data': (120, 1800),
+    'schedule': (30, 900),
+    'simple_cms': (120, 1800),
+    'group_rank_info': (60, 1800),
+}
+# 每次间隔随机浮动的比例，避免多个数据源总在同一时刻请求
+FEED_POLL_JITTER = 0.1
+# 连续失败时间隔按 2 的指数增长，最长不超过该值（空闲间隔更长时以空闲间隔为准）
+FEED_POLL_BACKOFF_MAX_SECONDS = 1800
+# 调度循环至少每隔多久重新判断一次比赛状态
+FEED_POLL_MAX_SLEEP_SECONDS = 60
+# 未结束的比赛在计划开赛前多久、开赛后多久之内视为比赛进行中
+LIVE_MATCH_LEAD_SECONDS = 30 * 60
+LIVE_MATCH_MAX_DURATION_SECONDS = 3 * 3600
+# 调度状态写入文件，任意工作进程都能通过 /api/feed_polling 查看
+FEED_POLL_STATUS_FILE = os.path.join(app.instance_path, 'feed_polling.json')
+# 手动刷新请求目录：任意工作进程写入以数据源命名的空文件，由后台任务进程的调度器取走并立即下载
+FEED_REFRESH_FOLDER = os.path.join(app.instance_path, 'feed_refresh')
+# 调度循环至少每隔多少秒检查一次刷新请求
+FEED_REFRESH_CHECK_SECONDS = 2
+
+def build_match_timeline(schedule):
+    """未结束比赛的计划开赛时间（Unix 时间戳，升序）"""
+    pending = []
+    for match in schedule['matches']:
+        if match.get('status') == 'DONE':
+            continue
+        started_at, _ = parse_match_time(match.get('planStartedAt'))
+        if started_at is not None:
+            pending.append(started_at.replace(tzinfo=timezone.utc).timestamp())
+    pending.sort()
+    return pending
 
-# 后台线程函数，定期下载数据
+def schedule_is_live(now=None):
+    """schedule.json 中是否有比赛正在进行或即将开始"""
+    try:
+        pending = feed_cache.derive(SCHEDULE_DATA_FILE, build_match_timeline)
+    except (FileNotFoundError, ValueError, KeyError):
+        return False
+    now = time.time() if now is None else now
+    i = bisect.bisect_left(pending, now - LIVE_MATCH_MAX_DURATION_SECONDS)
+    return i < len(pending) and pending[i] <= now + LIVE_MATCH_LEAD_SECONDS
+
+class FeedScheduler:
+    """
+    数据源自适应轮询，只在后台任务进程中运行。
+    每次循环重新判断比赛状态并计算各数据源的下次下载时间，到期的数据源交给线程池通过 fetch_feed 下载；
+    下载中的数据源不会重复提交，失败后按指数退避，成功（含 304）后恢复正常间隔。
+    """
+
+    def __init__(self, feeds):
+        self.feeds = {feed[0]: feed for feed in feeds}
+        self.running = False
+        self.live = False
+        self._lock = threading.Lock()
+        # 串行写出状态文件，避免较早的状态快照覆盖较新的
+        self._status_lock = threading.Lock()
+        self._wake = threading.Event()
+        now = time.time()
+        self._state = {
+            name: {
+                # 启动时在几秒内错开首次下载
+                'next_run': now + random.uniform(0, 5),
+                'last_run': None,
+                'failures': 0,
+                'jitter': 1.0,
+                'in_flight': False,
+                'refresh_requested': False,
+                'last_result': None,
+            }
+            for name in self.feeds
+        }
+
+    def interval(self, name, live):
+        return FEED_POLL_INTERVALS[name][0 if live else 1]
+
+    def _delay(self, name, state, live):
+        base = self.interval(name, live)
+        if state['failures']:
+            base = min(base * 2 ** state['failures'], max(FEED_POLL_BACKOFF_MAX_SECONDS, self.interval(name, False)))
+        return base * state['jitter']
+
+    def _due_at(self, name, state, live):
+        # 以上次下载完成时间加当前模式下的间隔计算，比赛开始后无需等到空闲间隔结束
+        if state['last_run'] is None:
+            return state['next_run']
+        return state['last_run'] + self._delay(name, state, live)
+
+    def record(self, name, result):
+        """记录一次下载结果，并写出调度状态"""
+        with self._lock:
+            state = self._state[name]
+            state['in_flight'] = False
+            state['failures'] = 0 if not result.get('error') else state['failures'] + 1
+            state['last_run'] = time.time()
+            state['jitter'] = random.uniform(1 - FEED_POLL_JITTER, 1 + FEED_POLL_JITTER)
+            state['last_result'] = result
+            if state['failures']:
+                feed_log.warning('%s 连续失败 %d 次，%.0f 秒后重试', name, state['failures'],
+                                 self._delay(name, state, self.live), extra={'feed': name})
+        self._wake.set()
+        self.write_status()
+
+    def _poll(self, name):
+        try:
+            result = fetch_feed(self.feeds[name])
+        except Exception as e:
+            feed_log.exception('轮询 %s 出错: %s', name, e)
+            result = {'feed': name, 'error': str(e)}
+        self.record(name, result)
+
+    def request_refresh(self, names):
+        """在本进程中请求立即下载指定数据源（下载中的数据源在完成后再下载一次）"""
+        with self._lock:
+            for name in names:
+                self._state[name]['refresh_requested'] = True
+        self._wake.set()
+        self.write_status()
+
+    def _take_refresh_requests(self):
+        """取走其他工作进程写入的刷新请求"""
+        try:
+            names = os.listdir(FEED_REFRESH_FOLDER)
+        except FileNotFoundError:
+            return []
+        for name in names:
+            try:
+                os.remove(os.path.join(FEED_REFRESH_FOLDER, name))
+            except FileNotFoundError:
+                pass
+        return [name for name in names if name in self._state]
+
+    def status(self):
+        with self._lock:
+            feeds = {}
+            for name, state in self._state.items():
+                feeds[name] = {
+                    'interval_seconds': self.interval(name, self.live),
+                    'failures': state['failures'],
+                    'in_flight': state['in_flight'],
+                    'refresh_requested': state['refresh_requested'],
+                    'last_run_at': (datetime.fromtimestamp(state['last_run'], timezone.utc).isoformat()
+                                    if state['last_run'] else None),
+                    'next_run_at': datetime.fromtimestamp(self._due_at(name, state, self.live), timezone.utc).isoformat(),
+                    'last_result': state['last_result'],
+                }
+        return {'running': self.running, 'pid': os.getpid(), 'live': self.live,
+                'updated_at': datetime.now(timezone.utc).isoformat(), 'feeds': feeds}
+
+    def write_status(self):
+        try:
+            os.makedirs(app.instance_path, exist_ok=True)
+            with self._status_lock:
+                atomic_write(FEED_POLL_STATUS_FILE, json.dumps(self.status(), ensure_ascii=False).encode('utf-8'))
+        except OSError as e:
+            feed_log.warning('写入轮询状态失败: %s', e)
+
+    def run(self):
+        self.running = True
+        executor = ThreadPoolExecutor(max_workers=len(self.feeds))
+        while True:
+            self._wake.clear()
+            requested = self._take_refresh_requests()
+            if requested:
+                feed_log.info('收到刷新请求: %s', ', '.join(requested))
+                self.request_refresh(requested)
+            live = schedule_is_live()
+            if live != self.live:
+                feed_log.info('切换为%s轮询', '比赛模式' if live else '空闲模式')
+                self.live = live
+                self.write_status()
+            now = time.time()
+            wait = FEED_POLL_MAX_SLEEP_SECONDS
+            with self._lock:
+                for name, state in self._state.items():
+                    if state['in_flight']:
+                        continue
+                    due = self._due_at(name, state, live)
+                    if state['refresh_requested'] or due <= now:
+                        state['in_flight'] = True
+                        state['refresh_requested'] = False
+                        executor.submit(self._poll, name)
+                    else:
+                        wait = min(wait, due - now)
+            self._wake.wait(min(wait, FEED_REFRESH_CHECK_SECONDS))
+
+feed_scheduler = FeedScheduler(FEEDS)
+
+# 后台线程函数，按比赛状态自适应地定期下载数据
 def background_downloader():
-    # while True:
-    #     download_robot_data()
-    #     # 每10分钟执行一次
-    #     time.sleep(600)
-    pass
+    feed_scheduler.run()
+
+# logo 清单：学校名 -> {url, filename, sha256, etag, last_modified, checked_at}
+LOGO_MANIFEST_FILE = os.path.join(LOGO_FOLDER, 'manifest.json')
+# 并行下载 logo 的线程数
+LOGO_DOWNLOAD_WORKERS = 8
+# URL 未变化的 logo 每隔多久用条件请求重新校验一次
+LOGO_REVALIDATE_SECONDS = 7 * 86400
+
+# 最近一次 logo 下载的统计信息
+logo_download_stats = {}
+
+# 创建安全的文件名
+def logo_safe_name(college_name):
+    return ''.join(c if c.isalnum() or c in '_-' else '_' for c in college_name)
+
+def load_logo_manifest():
+    try:
+        with open(LOGO_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+# 下载同一个 URL 的 logo，并写入使用该 URL 的所有学校的文件
+def fetch_logo(logo_url, college_names, manifest, hash_to_file, hash_lock):
+    # 从 URL 解析文件扩展名
+    ext = os.path.splitext(urlparse(logo_url).path)[1]
+    if not ext:
+        ext = '.jpg'  # 默认扩展名
+
+    # 只有所有学校都已有这个 URL 对应的文件时才发送条件请求
+    entries = [manifest.get(name) for name in college_names]
+    headers = {}
+    if all(e and e.get('url') == logo_url and os.path.exists(os.path.join(LOGO_FOLDER, e['filename'])) for e in entries):
+        if entries[0].get('etag'):
+            headers['If-None-Match'] = entries[0]['etag']
+        if entries[0].get('last_modified'):
+            headers['If-Modified-Since'] = entries[0]['last_modified']
+
+    response = http_session.get(logo_url, headers=headers, timeout=10)
+    now = time.time()
+    if response.status_code == 304:
+        return {name: dict(manifest[name], checked_at=now) for name in college_names}, 0, False
+    response.raise_for_status()
+
+    content = response.content
+    digest = hashlib.sha256(content).hexdigest()
+    updates = {}
+    for college_name in college_names:
+        filename = f"{logo_safe_name(college_name)}{ext}"
+        filepath = os.path.join(LOGO_FOLDER, filename)
+        old = manifest.get(college_name)
+        # 扩展名变化时删除旧文件
+        if old and old.get('filename') != filename and os.path.exists(os.path.join(LOGO_FOLDER, old['filename'])):
+            os.remove(os.path.join(LOGO_FOLDER, old['filename']))
+
+        if not (old and old.get('sha256') == digest and os.path.exists(filepath)):
+            with hash_lock:
+                existing = hash_to_file.setdefault(digest, filename)
+            linked = False
+            if existing and existing != filename and os.path.exists(os.path.join(LOGO_FOLDER, existing)):
+                # 内容相同的图片只保存一份，其他学校使用硬链接
+                tmp_path = filepath + '.tmp'
+                try:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    os.link(os.path.join(LOGO_FOLDER, existing), tmp_path)
+                    os.replace(tmp_path, filepath)
+                    linked = True
+                except OSError:
+                    linked = False
+            if not linked:
+                atomic_write(filepath, content)
+
+        updates[college_name] = {
+            'url': logo_url,
+            'filename': filename,
+            'sha256': digest,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'checked_at': now,
+        }
+    return updates, len(content), True
+
+# logo 浏览器缓存时间（秒）；文件名按学校命名，内容可能更新，依靠 ETag 重新校验
+LOGO_CACHE_MAX_AGE = 86400
 
-# 启动后台下载线程
-download_thread = threading.Thread(target=background_downloader, daemon=True)
-download_thread.start()
+# 内存中的 logo 索引：安全文件名（不含扩展名） -> {filename, etag}
+logo_index = {}
+# 建立索引时 logo 清单文件的签名；多进程部署时其他进程下载完成后据此发现清单变化
+logo_index_signature = None
+
+def logo_manifest_signature():
+    try:
+        return FeedCache._signature(LOGO_MANIFEST_FILE)
+    except FileNotFoundError:
+        return None
+
+# 清单文件变化（例如后台任务进程完成了下载）时重建索引
+def refresh_logo_index_if_stale():
+    if logo_manifest_signature() != logo_index_signature:
+        rebuild_logo_index()
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def rebuild_logo_index():
+    """扫描 logo 目录重建索引，构建完成后整体替换"""
+    global logo_index, logo_index_signature
+    signature = logo_manifest_signature()
+    manifest_hashes = {e['filename']: e.get('sha256') for e in load_logo_manifest().values() if e.get('filename')}
+    index = {}
+    for filename in os.listdir(LOGO_FOLDER):
+        path = os.path.join(LOGO_FOLDER, filename)
+        if filename == os.path.basename(LOGO_MANIFEST_FILE) or filename.endswith('.tmp') or not os.path.isfile(path):
+            continue
+        name_without_ext = os.path.splitext(filename)[0]
+        if name_without_ext in index:
+            continue
+        index[name_without_ext] = {
+            'filename': filename,
+            'etag': manifest_hashes.get(filename) or file_sha256(path),
+        }
+    logo_index = index
+    logo_index_signature = signature
+    return index
 
 # 下载学校 logo 的函数
 def download_school_logos():
     try:
-        # 确保 robot_data.json 文件存在
-        # if not os.path.exists(ROBOT_DATA_FILE):
-        #     download_robot_data()
-            
         # 读取 robot_data.json 文件
-        with open(ROBOT_DATA_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = feed_cache.get(ROBOT_DATA_FILE)
         
         # 记录所有学校的 logo URL
         logo_urls = {}
@@ -110,36 +1343,72 @@ def download_school_logos():
                 if college_name and logo_url:
                     logo_urls[college_name] = logo_url
         
-        # 下载每个学校的 logo
+        manifest = load_logo_manifest()
+        now = time.time()
+        
+        # URL 未变化且最近校验过的学校直接跳过；相同 URL 只下载一次
+        pending = {}
+        skipped = 0
         for college_name, logo_url in logo_urls.items():
-            try:
-                # 从 URL 解析文件扩展名
-                parsed_url = urlparse(logo_url)
-                path = parsed_url.path
-                ext = os.path.splitext(path)[1]
-                if not ext:
-                    ext = '.jpg'  # 默认扩展名
-                
-                # 创建安全的文件名
-                safe_name = ''.join(c if c.isalnum() or c in '_-' else '_' for c in college_name)
-                filename = f"{safe_name}{ext}"
-                filepath = os.path.join(LOGO_FOLDER, filename)
-                
-                # 如果文件不存在或已过期，则下载
-                if not os.path.exists(filepath) or (time.time() - os.path.getmtime(filepath)) > 86400:
-                    response = requests.get(logo_url, timeout=10)
-                    response.raise_for_status()
-                    
-                    with open(filepath, 'wb') as f:
-                        f.write(response.content)
-                    
-                    print(f"[{datetime.now()}] 成功下载 {college_name} 的 logo")
-            except Exception as e:
-                print(f"[{datetime.now()}] 下载 {college_name} 的 logo 失败: {str(e)}")
+            entry = manifest.get(college_name)
+            if (entry and entry.get('url') == logo_url
+                    and os.path.exists(os.path.join(LOGO_FOLDER, entry['filename']))
+                    and now - entry.get('checked_at', 0) < LOGO_REVALIDATE_SECONDS):
+                skipped += 1
+                continue
+            pending.setdefault(logo_url, []).append(college_name)
+        
+        hash_to_file = {
+            e['sha256']: e['filename'] for e in manifest.values()
+            if e.get('sha256') and os.path.exists(os.path.join(LOGO_FOLDER, e['filename']))
+        }
+        hash_lock = threading.Lock()
+        
+        start = time.perf_counter()
+        total = len(pending)
+        done = downloaded = failed = total_bytes = 0
+        with ThreadPoolExecutor(max_workers=LOGO_DOWNLOAD_WORKERS) as executor:
+            futures = {
+                executor.submit(fetch_logo, logo_url, names, manifest, hash_to_file, hash_lock): names
+                for logo_url, names in pending.items()
+            }
+            for future in as_completed(futures):
+                done += 1
+                names = futures[future]
+                try:
+                    updates, size, changed = future.result()
+                    manifest.update(updates)
+                    total_bytes += size
+                    if changed:
+                        downloaded += 1
+                except Exception as e:
+                    failed += 1
+                    logo_log.warning('下载 %s 的 logo 失败: %s', '、'.join(names), e)
+                # 每完成10%报告一次进度
+                if done == total or done % max(1, total // 10) == 0:
+                    elapsed = time.perf_counter() - start
+                    logo_log.info('logo 下载进度 %d/%d，%.1f 个/秒，%.1f KB/秒', done, total,
+                                  done / elapsed if elapsed else 0, total_bytes / 1024 / max(elapsed, 1e-6))
         
-        print(f"[{datetime.now()}] 学校 logo 下载完成")
+        atomic_write(LOGO_MANIFEST_FILE, json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8'))
+        
+        elapsed = time.perf_counter() - start
+        logo_download_stats.update({
+            'colleges': len(logo_urls),
+            'urls': total,
+            'skipped': skipped,
+            'downloaded': downloaded,
+            'not_modified': total - downloaded - failed,
+            'failed': failed,
+            'bytes': total_bytes,
+            'seconds': round(elapsed, 3),
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+        })
+        logo_log.info('学校 logo 下载完成: 下载 %d，未变化 %d，跳过 %d，失败 %d，共 %.1f KB，用时 %.2f 秒',
+                      downloaded, total - downloaded - failed, skipped, failed, total_bytes / 1024, elapsed)
+        rebuild_logo_index()
     except Exception as e:
-        print(f"[{datetime.now()}] 下载学校 logo 失败: {str(e)}")
+        logo_log.exception('下载学校 logo 失败: %s', e)
 
 # 后台线程函数，定期下载学校 logo
 def background_logo_downloader():
@@ -148,17 +1417,88 @@ def background_logo_downloader():
         # 每24小时执行一次
         time.sleep(86400)
 
-# 启动下载学校 logo 的后台线程
-logo_download_thread = threading.Thread(target=background_logo_downloader, daemon=True)
-logo_download_thread.start()
-
 db = SQLAlchemy(app)
 
+# 每个新的 SQLite 连接建立时设置 journal_mode、busy_timeout 和 synchronous
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {app.config['SQLITE_BUSY_TIMEOUT_MS']:d}")
+        cursor.execute(f"PRAGMA journal_mode = {app.config['SQLITE_JOURNAL_MODE']}")
+        cursor.execute(f"PRAGMA synchronous = {app.config['SQLITE_SYNCHRONOUS']}")
+    finally:
+        cursor.close()
+
+# 通过会话执行的写语句（ORM flush、批量 insert/update/delete 与原生 SQL）在提交后更新页面数据版本
+@event.listens_for(Session, 'after_flush')
+def track_flush_writes(session, flush_context):
+    if session.new or session.dirty or session.deleted:
+        session.info['data_changed'] = True
+
+@event.listens_for(Session, 'do_orm_execute')
+def track_statement_writes(orm_execute_state):
+    statement = orm_execute_state.statement
+    if getattr(statement, 'is_dml', False) or (
+            isinstance(statement, TextClause)
+            and not statement.text.lstrip().upper().startswith(('SELECT', 'PRAGMA'))):
+        orm_execute_state.session.info['data_changed'] = True
+
+@event.listens_for(Session, 'after_commit')
+def bump_version_after_commit(session):
+    if session.info.pop('data_changed', False):
+        bump_data_version()
+
+@event.listens_for(Session, 'after_rollback')
+def discard_writes_after_rollback(session):
+    session.info.pop('data_changed', None)
+
+# 统计 SQL 语句数与耗时：请求中执行的语句计入当前请求（请求结束时按端点汇总），其余计入 background
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_started_at'] = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def record_query_time(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop('query_started_at', time.perf_counter())
+    if has_request_context() and 'db_queries' in g:
+        g.db_queries += 1
+        g.db_seconds += elapsed
+    else:
+        metrics.inc('rmintel_db_queries_total', endpoint='background')
+        metrics.inc('rmintel_db_query_seconds_total', elapsed, endpoint='background')
+
+# 请求计时：按端点记录耗时、状态码与 SQL 语句数，并通过 Server-Timing 头在浏览器开发者工具中显示
+@app.before_request
+def start_request_timer():
+    g.request_started_at = time.perf_counter()
+    g.db_queries = 0
+    g.db_seconds = 0.0
+
+@app.after_request
+def record_request_metrics(response):
+    started_at = g.pop('request_started_at', None)
+    if started_at is None:
+        return response
+    elapsed = time.perf_counter() - started_at
+    # 未匹配的路径统一记为 unmatched，避免随意的 URL 产生大量标签
+    endpoint = request.url_rule.endpoint if request.url_rule is not None else 'unmatched'
+    metrics.observe('rmintel_http_request_duration_seconds', elapsed, endpoint=endpoint, method=request.method)
+    metrics.inc('rmintel_http_requests_total', endpoint=endpoint, method=request.method, status=str(response.status_code))
+    metrics.observe('rmintel_db_queries_per_request', g.db_queries, endpoint=endpoint)
+    metrics.inc('rmintel_db_queries_total', g.db_queries, endpoint=endpoint)
+    metrics.inc('rmintel_db_query_seconds_total', g.db_seconds, endpoint=endpoint)
+    response.headers['Server-Timing'] = (f'app;dur={elapsed * 1000:.1f}, '
+                                         f'db;dur={g.db_seconds * 1000:.1f};desc="{g.db_queries} queries"')
+    return response
+
 # 登录密码 - 建议更改为强密码
 try:
     LOGIN_PASSWORD = os.getenv('RMINTEL_LOGIN_PASSWORD')
 except Exception as e:
-    print(f"请在环境变量中设置密码")
+    app_log.error('请在环境变量中设置密码')
 
 def login_required(f):
     @wraps(f)
@@ -180,8 +1520,12 @@ class Team(db.Model):
     money = db.Column(db.Integer, nullable=True)  # 经济值（可为空）
     comment = db.Column(db.Text, nullable=True)  # 队伍备注（可为空）
     group = db.Column(db.String(10), default="A")  # 小组情况，默认为A组
+    missing_count = db.Column(db.Integer, nullable=True)  # 内容为空的战术条目数（写入时维护）
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    __table_args__ = (
+        db.Index('ix_team_school_team', 'school', 'team'),
+    )
     def __repr__(self):
         return f'<Team {self.school} - {self.team}'
 
@@ -193,16 +1537,94 @@ class TacticalData(db.Model):
     content = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # 每支队伍的每个战术条目只有一行，同时作为按 team_id 查询的索引
+    __table_args__ = (
+        db.Index('uq_tactical_data_cell', 'team_id', 'category', 'item', unique=True),
+    )
 
 # 新增图片模型
 class TeamImage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False, index=True)
     robot_type = db.Column(db.String(50), nullable=False)  # 机器人类型，如'步兵1'，'哨兵'等
     filename = db.Column(db.String(255), nullable=False)  # 存储的文件名
     description = db.Column(db.Text, nullable=True)  # 图片描述
     uploaded_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
+# 赛程比赛模型（由 schedule.json + simple_cms.json 导入，时间与赛段标签在导入时预先计算）
+class ScheduleMatch(db.Model):
+    id = db.Column(db.String(20), primary_key=True)  # 官方比赛ID
+    position = db.Column(db.Integer, nullable=False)  # 在赛程文件中的顺序，用于同一时间的比赛排序
+    title = db.Column(db.String(200), nullable=False)  # 赛事标题 + 分区赛/全国赛标签
+    match_type = db.Column(db.String(20), nullable=True)
+    status = db.Column(db.String(20), nullable=True)
+    result = db.Column(db.String(10), nullable=True)
+    plan_game_count = db.Column(db.Integer, nullable=True)
+    plan_started_at = db.Column(db.String(30), nullable=True)  # 原始UTC时间字符串
+    started_at = db.Column(db.DateTime, nullable=True, index=True)  # 解析后的UTC时间
+    formatted_time = db.Column(db.String(30), nullable=True)  # 北京时间 "%Y-%m-%d %H:%M"
+    red_score = db.Column(db.Integer, nullable=True)
+    red_win_count = db.Column(db.Integer, nullable=True)
+    blue_score = db.Column(db.Integer, nullable=True)
+    blue_win_count = db.Column(db.Integer, nullable=True)
+    replay_url = db.Column(db.String(500), nullable=True)
+
+# 比赛双方信息
+class ScheduleMatchSide(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    match_id = db.Column(db.String(20), db.ForeignKey('schedule_match.id'), nullable=False)
+    side = db.Column(db.String(10), nullable=False)  # 'RED' 或 'BLUE'
+    team_name = db.Column(db.String(100), nullable=True)
+    college = db.Column(db.String(100), nullable=True)
+    logo = db.Column(db.String(500), nullable=True)
+    rank = db.Column(db.Integer, nullable=True)  # 小组内排名
+    __table_args__ = (
+        db.Index('ix_schedule_match_side_college', 'college', 'match_id'),
+        db.Index('ix_schedule_match_side_match', 'match_id', 'side'),
+    )
+
+# 系统元数据（键值对），如战术数据分类布局的指纹
+class AppMeta(db.Model):
+    key = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.Text, nullable=True)
+
+# 机器人指标历史：下载的 robot_data.json 中有机器人指标变化时记录一个快照，只为指标发生变化的机器人保存一行
+class RobotSnapshot(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    taken_at = db.Column(db.DateTime, nullable=False, index=True)
+    robot_count = db.Column(db.Integer, nullable=False)  # 快照中的机器人数
+    changed_count = db.Column(db.Integer, nullable=False)  # 指标有变化、写入了数据点的机器人数
+
+# 历史中出现过的机器人及其最近一次指标（用于判断是否变化）
+class RobotHistoryRobot(db.Model):
+    robot_id = db.Column(db.Integer, primary_key=True)  # 官方机器人ID
+    college = db.Column(db.String(100), nullable=True, index=True)
+    team_name = db.Column(db.String(100), nullable=True)
+    robot_type = db.Column(db.String(20), nullable=True)
+    robot_number = db.Column(db.Integer, nullable=True)
+    last_values = db.Column(db.LargeBinary, nullable=False)
+
+# 机器人指标数据点：values 为按 HISTORY_METRIC_FIELDS 顺序排列的 float32 数组（缺失为 NaN）
+class RobotMetricPoint(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    robot_id = db.Column(db.Integer, nullable=False)
+    snapshot_id = db.Column(db.Integer, db.ForeignKey('robot_snapshot.id'), nullable=False)
+    taken_at = db.Column(db.DateTime, nullable=False)
+    values = db.Column(db.LargeBinary, nullable=False)
+    __table_args__ = (db.Index('ix_robot_metric_point_robot_time', 'robot_id', 'taken_at'),)
+
+# 用一条 UPDATE 重新统计队伍的缺失条目数（不传 team_ids 时更新所有队伍）
+def refresh_missing_counts(team_ids=None):
+    empty_count = (db.select(db.func.count(TacticalData.id))
+                   .where(TacticalData.team_id == Team.id,
+                          db.or_(TacticalData.content.is_(None), TacticalData.content == ''))
+                   .scalar_subquery())
+    # 保持 updated_at 不变，统计数变化不算队伍信息更新
+    stmt = db.update(Team).values(missing_count=empty_count, updated_at=Team.updated_at)
+    if team_ids is not None:
+        stmt = stmt.where(Team.id.in_(team_ids))
+    db.session.execute(stmt)
+
 # 32支预定义队伍（含排名）
 PREDEFINED_TEAMS = [
     {"school": "演示大学", "team": "DEMO", "rank": 99, "rank_exam": 99, "money": -100},
@@ -293,20 +1715,108 @@ def logout():
 @app.route('/')
 @login_required
 def index():
+    return cached_page('index', render_index)
+
+def render_index():
     teams = Team.query.all()
-    echelons = get_echelons(teams)  # 获取梯队数据
     
-    # 计算每个战队未更新的条目数
-    team_update_stats = {}
-    for team in teams:
-        # 获取该队伍的所有战术数据
-        tactical_data = TacticalData.query.filter_by(team_id=team.id).all()
-        # 计算空内容（未更新）的条目数量
-        empty_items = sum(1 for data in tactical_data if not data.content)
-        team_update_stats[team.id] = empty_items
+    # 每个战队未更新的条目数（写入时维护，缺失时补算一次）
+    stale_ids = [team.id for team in teams if team.missing_count is None]
+    if stale_ids:
+        refresh_missing_counts(stale_ids)
+        db.session.commit()
+        teams = Team.query.all()
+    team_update_stats = {team.id: team.missing_count for team in teams}
+    
+    echelons = get_echelons(teams)  # 获取梯队数据
     
     return render_template('index.html', teams=teams, echelons=echelons, update_stats=team_update_stats)
 
+# 批量创建队伍及其全部战术条目（单个事务，队伍与战术条目各一次批量插入）
+def bulk_create_teams(team_rows):
+    """team_rows 为 Team 字段组成的字典列表，返回 (新建队伍数, 新建战术条目数)"""
+    if not team_rows:
+        return 0, 0
+    item_count = sum(len(items) for _, items in TACTICAL_CATEGORIES)
+    now = datetime.now(timezone.utc)
+    rows = [dict({'group': 'A', 'rank': None, 'rank_exam': None, 'money': None, 'comment': ''},
+                 **row, missing_count=item_count, created_at=now, updated_at=now)
+            for row in team_rows]
+
+    # 新队伍 id 直接由插入语句返回，不受其他写入者同时插入的影响；
+    # SQLite 3.35 以上一次批量 INSERT ... RETURNING，更早的版本逐行插入并读取主键
+    table = Team.__table__
+    if db.session.get_bind().dialect.insert_executemany_returning:
+        new_ids = db.session.scalars(table.insert().returning(table.c.id), rows).all()
+    else:
+        new_ids = [db.session.execute(table.insert(), row).inserted_primary_key[0] for row in rows]
+
+    tactical_rows = [
+        {'team_id': team_id, 'category': category, 'item': item, 'content': '',
+         'created_at': now, 'updated_at': now}
+        for team_id in new_ids
+        for category, items in TACTICAL_CATEGORIES
+        for item in items
+    ]
+    db.session.execute(TacticalData.__table__.insert(), tactical_rows)
+    db.session.commit()
+    return len(new_ids), len(tactical_rows)
+
+# 从 robot_data.json 的所有赛区导入队伍，已存在的学校/队伍组合会被跳过
+def import_teams_from_robot_data():
+    start = time.perf_counter()
+    data = feed_cache.get(ROBOT_DATA_FILE)
+
+    existing = set(db.session.query(Team.school, Team.team))
+    new_rows = []
+    skipped = 0
+    for zone in data.get('zones', []):
+        for team in zone.get('teams', []):
+            school = team.get('collegeName', '')
+            team_name = team.get('name', '')
+            if not school or not team_name:
+                continue
+            if (school, team_name) in existing:
+                skipped += 1
+                continue
+            existing.add((school, team_name))
+            new_rows.append({'school': school, 'team': team_name})
+
+    try:
+        teams_created, items_created = bulk_create_teams(new_rows)
+    except Exception:
+        db.session.rollback()
+        raise
+    result = {
+        'teams_created': teams_created,
+        'tactical_items_created': items_created,
+        'skipped': skipped,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    team_log.info('导入队伍完成: 新建 %d 支队伍、%d 个战术条目，跳过 %d 支已存在队伍，用时 %s 秒',
+                  teams_created, items_created, skipped, result['seconds'], extra={'import_result': result})
+    return result
+
+# 从官方数据批量导入队伍
+@app.route('/import_teams', methods=['POST'])
+@login_required
+def import_teams():
+    try:
+        result = import_teams_from_robot_data()
+    except FileNotFoundError:
+        return jsonify({'message': '未找到机器人数据文件，无法导入'}), 404
+    result['message'] = (f"新建 {result['teams_created']} 支队伍（{result['tactical_items_created']} 个战术条目），"
+                         f"跳过 {result['skipped']} 支已存在队伍，用时 {result['seconds']} 秒")
+    return jsonify(result)
+
+# 命令行导入：flask --app app import-teams
+@app.cli.command('import-teams')
+def import_teams_command():
+    """从 robot_data.json 的所有赛区批量导入队伍"""
+    init_database()
+    result = import_teams_from_robot_data()
+    click.echo(json.dumps(result, ensure_ascii=False))
+
 # 添加队伍
 @app.route('/add_team', methods=['GET', 'POST'])
 @login_required
@@ -321,8 +1831,9 @@ def add_team():
             flash('队伍已存在', 'error')
             return redirect(url_for('add_team'))
         
-        # 创建队伍
-        new_team = Team(school=school, team=team_name, rank=rank)
+        # 创建队伍（所有战术条目初始为空）
+        new_team = Team(school=school, team=team_name, rank=rank,
+                        missing_count=sum(len(items) for _, items in TACTICAL_CATEGORIES))
         db.session.add(new_team)
         db.session.commit()
         
@@ -341,9 +1852,278 @@ def add_team():
         flash('队伍添加成功', 'success')
         return redirect(url_for('index'))
     
-    return render_template('add_team.html', predefined_teams=PREDEFINED_TEAMS)
+    return render_template('add_team.html', predefined_teams=PREDEFINED_TEAMS)
+
+# 上传图片的最大宽高与 JPEG 质量（使用较高的压缩率来节省带宽）
+UPLOAD_MAX_SIZE = (1200, 1200)
+UPLOAD_JPEG_QUALITY = 65
+# 处理上传图片的进程数
+IMAGE_PROCESS_WORKERS = int(os.getenv('RMINTEL_IMAGE_WORKERS', str(min(4, os.cpu_count() or 1))))
+# 批量上传任务的状态文件目录（多进程部署时任一进程都能查询）与保留时间（秒）
+UPLOAD_JOB_FOLDER = os.path.join(app.instance_path, 'upload_jobs')
+UPLOAD_JOB_RETENTION_SECONDS = 86400
+# 处理中的任务至少每隔多少秒更新一次状态文件（心跳）；超过 UPLOAD_JOB_STALE_SECONDS 未更新视为处理进程已退出
+UPLOAD_JOB_HEARTBEAT_SECONDS = 10
+UPLOAD_JOB_STALE_SECONDS = 120
+
+# 图片衍生尺寸（最长边像素）：缩略图用于编辑/详情页的小图，中图用于图片墙；full 为上传时保存的图片（最长边 ≤1200）
+IMAGE_DERIVATIVE_SIZES = {'thumb': 320, 'medium': 800}
+IMAGE_DERIVATIVE_QUALITY = 70
+# 当前 Pillow 是否支持 WebP，不支持时只提供 JPEG
+IMAGE_WEBP_SUPPORTED = features.check('webp')
+# 衍生图的磁盘缓存目录与容量上限，超出上限时按最近使用时间淘汰
+IMAGE_CACHE_FOLDER = os.path.join(app.instance_path, 'image_cache')
+IMAGE_CACHE_MAX_BYTES = int(os.getenv('RMINTEL_IMAGE_CACHE_MAX_MB', '512')) * 1024 * 1024
+# 上传图片的文件名唯一且内容不会改变，衍生图可以长期缓存
+IMAGE_CACHE_MAX_AGE = 365 * 86400
+
+_image_cache_bytes = None
+_image_cache_lock = threading.Lock()
+
+def image_derivative_path(size, name):
+    return os.path.join(IMAGE_CACHE_FOLDER, size, name)
+
+def image_derivative_names(filename):
+    """上传图片对应的所有衍生图 (尺寸, 文件名)"""
+    base = os.path.splitext(filename)[0]
+    formats = ['jpg', 'webp'] if IMAGE_WEBP_SUPPORTED else ['jpg']
+    names = [(size, f"{base}.{fmt}") for size in IMAGE_DERIVATIVE_SIZES for fmt in formats]
+    if IMAGE_WEBP_SUPPORTED:
+        names.append(('full', f"{base}.webp"))
+    return names
+
+def render_image_derivative(img, size, name):
+    """从已解码的图片生成一张衍生图并写入缓存，返回文件大小"""
+    if size in IMAGE_DERIVATIVE_SIZES:
+        img = img.copy()
+        img.thumbnail((IMAGE_DERIVATIVE_SIZES[size],) * 2, Image.LANCZOS)
+    buffer = io.BytesIO()
+    if name.endswith('.webp'):
+        img.save(buffer, 'WEBP', quality=IMAGE_DERIVATIVE_QUALITY, method=4)
+    else:
+        img.save(buffer, 'JPEG', quality=IMAGE_DERIVATIVE_QUALITY, optimize=True)
+    path = image_derivative_path(size, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, buffer.getvalue())
+    return buffer.tell()
+
+def scan_image_cache():
+    """返回缓存中所有衍生图的 (mtime, 大小, 路径)"""
+    entries = []
+    for root, _, files in os.walk(IMAGE_CACHE_FOLDER):
+        for filename in files:
+            if filename.endswith('.tmp'):
+                continue
+            path = os.path.join(root, filename)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+    return entries
+
+def evict_image_cache():
+    """按最近使用时间淘汰最旧的衍生图，直到缓存降到上限的 90%；调用方需持有 _image_cache_lock"""
+    global _image_cache_bytes
+    entries = sorted(scan_image_cache())
+    total = sum(size for _, size, _ in entries)
+    target = IMAGE_CACHE_MAX_BYTES * 0.9
+    removed = 0
+    for _, size, path in entries:
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    _image_cache_bytes = total
+    image_log.info('图片缓存淘汰 %d 个文件，当前 %.1f MB', removed, total / 1024 / 1024)
+
+def image_cache_added(nbytes):
+    """记录新写入的衍生图大小，超出容量上限时淘汰"""
+    global _image_cache_bytes
+    with _image_cache_lock:
+        if _image_cache_bytes is None:
+            _image_cache_bytes = sum(size for _, size, _ in scan_image_cache())
+        else:
+            _image_cache_bytes += nbytes
+        if _image_cache_bytes > IMAGE_CACHE_MAX_BYTES:
+            evict_image_cache()
+
+def touch_image_cache_entry(path):
+    """命中时更新 mtime 作为最近使用时间；一小时内只更新一次，减少磁盘写入"""
+    try:
+        if time.time() - os.path.getmtime(path) > 3600:
+            os.utime(path)
+    except OSError:
+        pass
+
+def remove_image_derivatives(filename):
+    for size, name in image_derivative_names(filename):
+        try:
+            os.remove(image_derivative_path(size, name))
+        except FileNotFoundError:
+            pass
+
+# 模板中使用：image_url(image.filename, 'thumb', 'webp')
+@app.template_global()
+def image_url(filename, size='full', fmt='jpg'):
+    return url_for('serve_team_image', size=size, name=f"{os.path.splitext(filename)[0]}.{fmt}")
+
+@app.context_processor
+def inject_image_formats():
+    return {'webp_supported': IMAGE_WEBP_SUPPORTED}
+
+image_process_pool = None
+_image_pool_lock = threading.Lock()
+
+def get_image_process_pool():
+    """按需创建图片处理进程池（使用 spawn，避免 fork 带有线程和数据库连接的进程）"""
+    global image_process_pool
+    with _image_pool_lock:
+        if image_process_pool is None:
+            image_process_pool = ProcessPoolExecutor(max_workers=IMAGE_PROCESS_WORKERS,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+        return image_process_pool
+
+def discard_image_process_pool(pool):
+    """工作进程异常退出后进程池不可再用，丢弃后下次按需重建"""
+    global image_process_pool
+    with _image_pool_lock:
+        if image_process_pool is pool:
+            image_process_pool = None
+    pool.shutdown(wait=False)
+
+def process_upload_image(source, dest_path):
+    """解码、缩小并压缩为 JPEG，同时生成各尺寸衍生图，返回处理耗时与结果尺寸；可在进程池中运行"""
+    start = time.perf_counter()
+    img = Image.open(source)
+    # 转换为RGB模式(如果是RGBA等带透明通道的模式，移除透明通道)
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    # 调整图片大小，如果太大的话
+    if img.width > UPLOAD_MAX_SIZE[0] or img.height > UPLOAD_MAX_SIZE[1]:
+        img.thumbnail(UPLOAD_MAX_SIZE, Image.LANCZOS)
+    img.save(dest_path, 'JPEG', quality=UPLOAD_JPEG_QUALITY, optimize=True)
+    derived_bytes = sum(render_image_derivative(img, size, name)
+                        for size, name in image_derivative_names(os.path.basename(dest_path)))
+    return {
+        'seconds': round(time.perf_counter() - start, 3),
+        'width': img.width,
+        'height': img.height,
+        'bytes': os.path.getsize(dest_path),
+        'derived_bytes': derived_bytes,
+    }
+
+def upload_job_path(job_id):
+    return os.path.join(UPLOAD_JOB_FOLDER, f"{job_id}.json")
+
+def save_upload_job(job):
+    job['updated_at'] = datetime.now(timezone.utc).isoformat()
+    atomic_write(upload_job_path(job['id']), json.dumps(job, ensure_ascii=False).encode('utf-8'))
+
+def prune_upload_jobs():
+    """删除过期的任务状态文件"""
+    cutoff = time.time() - UPLOAD_JOB_RETENTION_SECONDS
+    for filename in os.listdir(UPLOAD_JOB_FOLDER):
+        path = os.path.join(UPLOAD_JOB_FOLDER, filename)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+def run_upload_job(job, futures, pool):
+    """等待进程池处理完所有图片，然后在一个事务中写入 TeamImage 记录"""
+    start = time.perf_counter()
+    pending = set(futures)
+    while pending:
+        # 单张大图处理较慢时也定期写入状态文件，作为心跳
+        done, pending = wait(pending, timeout=UPLOAD_JOB_HEARTBEAT_SECONDS, return_when=FIRST_COMPLETED)
+        for future in done:
+            entry, incoming_path = futures[future]
+            try:
+                entry.update(future.result())
+                entry['status'] = 'done'
+                image_cache_added(entry['derived_bytes'])
+            except Exception as e:
+                entry.update(status='failed', error=str(e))
+                image_log.warning('图片处理失败: %s: %s', entry['original'], e, extra={'job_id': job['id']})
+                if isinstance(e, BrokenProcessPool):
+                    discard_image_process_pool(pool)
+                output_path = os.path.join(app.config['UPLOAD_FOLDER'], entry['filename'])
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+            finally:
+                os.remove(incoming_path)
+            job['processed'] += 1
+        save_upload_job(job)
+    
+    processed = [entry for entry in job['images'] if entry['status'] == 'done']
+    try:
+        with app.app_context():
+            db.session.add_all([
+                TeamImage(team_id=job['team_id'], robot_type=job['robot_type'],
+                          filename=entry['filename'], description=job['description'])
+                for entry in processed
+            ])
+            db.session.commit()
+        job['status'] = 'done'
+    except Exception as e:
+        job['status'] = 'failed'
+        job['error'] = str(e)
+        image_log.exception('保存图片记录失败: %s', e, extra={'job_id': job['id']})
+    job['succeeded'] = len(processed)
+    job['failed'] = len(job['images']) - len(processed)
+    job['seconds'] = round(time.perf_counter() - start, 3)
+    job['finished_at'] = datetime.now(timezone.utc).isoformat()
+    save_upload_job(job)
+    
+    timings = [entry['seconds'] for entry in processed]
+    image_log.info('批量上传 %s 完成: 成功 %d，失败 %d，总用时 %.2f 秒，单张平均 %.3f 秒', job['id'],
+                   len(processed), job['failed'], job['seconds'], sum(timings) / max(len(timings), 1),
+                   extra={'job_id': job['id']})
+
+def start_upload_job(team_id, files, robot_type, description):
+    """暂存上传的原始文件并提交到进程池处理，后台线程等待结果后写入数据库，返回任务状态"""
+    os.makedirs(UPLOAD_JOB_FOLDER, exist_ok=True)
+    prune_upload_jobs()
+    
+    job_id = uuid.uuid4().hex
+    job = {
+        'id': job_id,
+        'team_id': team_id,
+        'robot_type': robot_type,
+        'description': description,
+        'status': 'processing',
+        'total': len(files),
+        'processed': 0,
+        'images': [],
+        'created_at': datetime.now(timezone.utc).isoformat(),
+    }
+    
+    pool = get_image_process_pool()
+    futures = {}
+    timestamp = int(datetime.now().timestamp())
+    for i, file in enumerate(files):
+        # 获取安全的文件名基础部分；加上任务ID与序号，避免同名照片互相覆盖
+        name, ext = os.path.splitext(secure_filename(file.filename))
+        filename_base = f"{timestamp}_{job_id[:8]}_{i}_{name}"
+        incoming_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{filename_base}.incoming{ext}")
+        file.save(incoming_path)
+        entry = {'original': file.filename, 'filename': f"{filename_base}.jpg", 'status': 'processing'}
+        job['images'].append(entry)
+        future = pool.submit(process_upload_image, incoming_path,
+                             os.path.join(app.config['UPLOAD_FOLDER'], entry['filename']))
+        futures[future] = (entry, incoming_path)
+    
+    save_upload_job(job)
+    threading.Thread(target=run_upload_job, args=(job, futures, pool), daemon=True).start()
+    return job
 
-# 上传图片
+# 上传图片：与批量上传一样交给进程池处理，请求线程只负责暂存原始文件
 @app.route('/upload_image/<int:team_id>', methods=['POST'])
 @login_required
 def upload_image(team_id):
@@ -363,47 +2143,106 @@ def upload_image(team_id):
     description = request.form.get('description', '')
     
     if file and allowed_file(file.filename):
+        # 只检查文件头与结构（不解码像素），无法识别的图片立即提示，不进入后台任务
         try:
-            # 获取安全的文件名基础部分
-            original_filename = secure_filename(file.filename)
-            filename_base = f"{int(datetime.now().timestamp())}_{os.path.splitext(original_filename)[0]}"
-            
-            # 打开图片并转换为RGB模式(如果是RGBA，移除透明通道)
-            img = Image.open(file.stream)
-            if img.mode == 'RGBA':
-                img = img.convert('RGB')
-                
-            # 调整图片大小，如果太大的话
-            max_size = (1200, 1200)  # 最大宽高
-            if img.width > max_size[0] or img.height > max_size[1]:
-                img.thumbnail(max_size, Image.LANCZOS)
-            
-            # 压缩并保存为jpg格式
-            compressed_filename = f"{filename_base}.jpg"
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], compressed_filename)
-            
-            # 使用较高的压缩率(质量较低的数值)来节省带宽
-            img.save(filepath, 'JPEG', quality=65, optimize=True)
-            
-            # 保存到数据库
-            image = TeamImage(
-                team_id=team_id,
-                robot_type=robot_type,
-                filename=compressed_filename,
-                description=description
-            )
-            db.session.add(image)
-            db.session.commit()
-            
-            flash('图片上传成功', 'success')
+            with Image.open(file.stream) as probe:
+                probe.verify()
         except Exception as e:
-            print(f"图片处理失败: {str(e)}")
+            image_log.warning('图片处理失败: %s: %s', file.filename, e)
             flash('图片处理失败', 'error')
+            return redirect(url_for('edit_team', id=team_id))
+        file.stream.seek(0)
+        
+        try:
+            start_upload_job(team_id, [file], robot_type, description)
+            flash('图片上传成功，正在后台处理，稍后刷新页面即可看到', 'success')
+        except Exception as e:
+            image_log.warning('图片上传失败: %s', e)
+            flash('图片上传失败', 'error')
     else:
         flash('不支持的文件类型', 'error')
     
     return redirect(url_for('edit_team', id=team_id))
 
+# 批量上传图片：原始文件先暂存，由进程池并行处理，前端轮询任务状态
+@app.route('/upload_images/<int:team_id>', methods=['POST'])
+@login_required
+def upload_images(team_id):
+    # 必须在读取表单之前设置
+    request.max_content_length = BATCH_UPLOAD_MAX_CONTENT_LENGTH
+    Team.query.get_or_404(team_id)
+    
+    files = [file for file in request.files.getlist('images') if file and file.filename]
+    if not files:
+        return jsonify({'message': '没有选择文件'}), 400
+    rejected = [file.filename for file in files if not allowed_file(file.filename)]
+    if rejected:
+        return jsonify({'message': '不支持的文件类型', 'rejected': rejected}), 400
+    too_large = [file.filename for file in files
+                 if file.stream.seek(0, os.SEEK_END) > app.config['MAX_CONTENT_LENGTH']]
+    for file in files:
+        file.stream.seek(0)
+    if too_large:
+        return jsonify({'message': '单个文件不能超过16MB', 'rejected': too_large}), 413
+    
+    job = start_upload_job(team_id, files, request.form.get('robot_type', ''), request.form.get('description', ''))
+    return jsonify({'job_id': job['id'], 'status_url': url_for('upload_job_status', job_id=job['id'])}), 202
+
+# 查询批量上传任务状态（含每张图片的处理耗时）
+@app.route('/upload_jobs/<job_id>')
+@login_required
+def upload_job_status(job_id):
+    if not re.fullmatch(r'[0-9a-f]{32}', job_id):
+        abort(404)
+    try:
+        with open(upload_job_path(job_id), 'r', encoding='utf-8') as f:
+            job = json.load(f)
+    except FileNotFoundError:
+        abort(404)
+    
+    # 负责该任务的进程已退出（如工作进程被回收）时心跳停止，报告为失败，前端不再无限轮询
+    updated_at = datetime.fromisoformat(job.get('updated_at') or job['created_at'])
+    if job['status'] == 'processing' and (datetime.now(timezone.utc) - updated_at).total_seconds() > UPLOAD_JOB_STALE_SECONDS:
+        for entry in job['images']:
+            if entry['status'] == 'processing':
+                entry.update(status='failed', error='后台处理中断')
+        job.update(status='failed', error='后台处理中断（处理进程已退出），请重新上传',
+                   succeeded=0, failed=job['total'])
+    return jsonify(job)
+
+# 提供上传图片的各尺寸版本：首次请求时生成并写入磁盘缓存，文件名不变则内容不变，可长期缓存
+@app.route('/images/<size>/<name>')
+@login_required
+def serve_team_image(size, name):
+    base, ext = os.path.splitext(name)
+    if size != 'full' and size not in IMAGE_DERIVATIVE_SIZES:
+        abort(404)
+    if secure_filename(name) != name or ext not in ('.jpg', '.webp'):
+        abort(404)
+    if ext == '.webp' and not IMAGE_WEBP_SUPPORTED:
+        abort(404)
+    
+    source_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{base}.jpg")
+    if size == 'full' and ext == '.jpg':
+        path = source_path
+    else:
+        path = image_derivative_path(size, name)
+        if os.path.exists(path):
+            touch_image_cache_entry(path)
+        else:
+            if not os.path.exists(source_path):
+                abort(404)
+            with Image.open(source_path) as img:
+                image_cache_added(render_image_derivative(img, size, name))
+    if not os.path.exists(path):
+        abort(404)
+    
+    response = send_file(os.path.abspath(path), max_age=IMAGE_CACHE_MAX_AGE, conditional=True)
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response
+
 # 删除图片
 @app.route('/delete_image/<int:image_id>', methods=['POST'])
 @login_required
@@ -420,21 +2259,22 @@ def delete_image(image_id):
         db.session.delete(image)
         db.session.commit()
         
-        # 删除物理文件
+        # 删除物理文件及各尺寸衍生图
+        remove_image_derivatives(filename)
         if os.path.exists(file_path):
             try:
                 os.remove(file_path)
-                print(f"成功删除文件: {file_path}")
+                image_log.info('成功删除文件: %s', file_path)
             except Exception as e:
-                print(f"删除文件错误: {e}")
+                image_log.error('删除文件错误: %s', e)
         else:
-            print(f"文件不存在: {file_path}")
+            image_log.warning('文件不存在: %s', file_path)
         
         flash('图片已删除', 'success')
         return redirect(url_for('edit_team', id=team_id))
     
     except Exception as e:
-        print(f"删除图片过程中发生错误: {e}")
+        image_log.exception('删除图片过程中发生错误: %s', e)
         flash('删除图片失败，请重试', 'error')
         return redirect(url_for('index'))
 
@@ -549,8 +2389,13 @@ def edit_team(id):
                 has_changes = True
         
         # 更新战术数据 - 只更新有变化的内容
+        # 按ID索引所有战术数据项
+        data_by_id = {item.id: item for items in categorized_data.values() for item in items}
         # 创建一个集合存储所有战术数据ID
-        all_data_ids = {item.id for items in categorized_data.values() for item in items}
+        all_data_ids = set(data_by_id)
+        
+        # 空条目数的变化量，用于维护 team.missing_count
+        missing_delta = 0
         
         # 处理提交的表单数据
         for key, value in request.form.items():
@@ -561,17 +2406,16 @@ def edit_team(id):
                     data_id = int(key.replace('content_', ''))
                     
                     # 查找对应的战术数据项
-                    for items in categorized_data.values():
-                        for item in items:
-                            if item.id == data_id:
-                                # 检查内容是否有变化
-                                if value != item.content:
-                                    item.content = value
-                                    item.updated_at = datetime.now(timezone.utc)
-                                    has_changes = True
-                                # 从集合中移除已处理的ID
-                                all_data_ids.discard(data_id)
-                                break
+                    item = data_by_id.get(data_id)
+                    if item is not None:
+                        # 检查内容是否有变化
+                        if value != item.content:
+                            missing_delta += (not value) - (not item.content)
+                            item.content = value
+                            item.updated_at = datetime.now(timezone.utc)
+                            has_changes = True
+                        # 从集合中移除已处理的ID
+                        all_data_ids.discard(data_id)
                 except ValueError:
                     pass
         
@@ -589,16 +2433,22 @@ def edit_team(id):
         # 对于AJAX请求，这些字段保持不变；对于普通请求，重置为空
         if not is_ajax:
             for data_id in all_data_ids:
-                for items in categorized_data.values():
-                    for item in items:
-                        if item.id == data_id and item.content:
-                            item.content = ''
-                            item.updated_at = datetime.now(timezone.utc)
-                            has_changes = True
+                item = data_by_id[data_id]
+                if item.content:
+                    missing_delta += 1
+                    item.content = ''
+                    item.updated_at = datetime.now(timezone.utc)
+                    has_changes = True
         
         # 只有当有变化时才更新队伍的更新时间并提交
         if has_changes:
             team.updated_at = datetime.now(timezone.utc)
+            if missing_delta:
+                if team.missing_count is None:
+                    db.session.flush()
+                    refresh_missing_counts([team.id])
+                else:
+                    team.missing_count += missing_delta
             db.session.commit()
             
             if is_ajax:
@@ -616,6 +2466,61 @@ def edit_team(id):
     
     return render_template('edit_team.html', team=team, data=categorized_data, images=categorized_images)
 
+# 按字段更新战术数据：请求体为 {战术数据ID: 新内容}，只写入内容有变化的条目
+@app.route('/api/team/<int:id>/tactical', methods=['PATCH'])
+@login_required
+def patch_tactical_data(id):
+    changes = request.get_json(silent=True)
+    if not isinstance(changes, dict) or not changes:
+        return jsonify({'message': '请求格式错误，应为 {ID: 内容}'}), 400
+    
+    try:
+        changes = {int(data_id): ('' if content is None else str(content)) for data_id, content in changes.items()}
+    except (TypeError, ValueError):
+        return jsonify({'message': '战术数据ID必须为整数'}), 400
+    
+    # 只读取本次提交涉及的条目，并校验它们属于该队伍
+    current = dict(db.session.query(TacticalData.id, TacticalData.content)
+                   .filter(TacticalData.team_id == id, TacticalData.id.in_(list(changes))))
+    unknown_ids = sorted(set(changes) - set(current))
+    if unknown_ids:
+        if db.session.get(Team, id) is None:
+            abort(404)
+        return jsonify({'message': '战术数据不属于该队伍', 'unknown_ids': unknown_ids}), 400
+    
+    now = datetime.now(timezone.utc)
+    rows = [
+        {'b_id': data_id, 'b_content': content, 'b_updated_at': now}
+        for data_id, content in changes.items()
+        if content != current[data_id]
+    ]
+    if not rows:
+        return jsonify({'message': '没有检测到数据变化', 'updated': {}, 'redirect': url_for('view_team', id=id)})
+    
+    missing_delta = sum((not row['b_content']) - (not current[row['b_id']]) for row in rows)
+    
+    # 一条 UPDATE 语句批量执行（executemany）
+    table = TacticalData.__table__
+    db.session.execute(
+        table.update()
+        .where(table.c.id == db.bindparam('b_id'))
+        .values(content=db.bindparam('b_content'), updated_at=db.bindparam('b_updated_at')),
+        rows
+    )
+    team_table = Team.__table__
+    db.session.execute(
+        team_table.update()
+        .where(team_table.c.id == id)
+        .values(updated_at=now, missing_count=team_table.c.missing_count + missing_delta)
+    )
+    db.session.commit()
+    
+    return jsonify({
+        'message': '数据更新成功',
+        'updated': {str(row['b_id']): now.isoformat() for row in rows},
+        'redirect': url_for('view_team', id=id),
+    })
+
 # 修改查看队伍的路由，添加图片数据
 @app.route('/view_team/<int:id>')
 @login_required
@@ -640,6 +2545,183 @@ def view_team(id):
     
     return render_template('view_team.html', team=team, data=categorized_data, images=categorized_images)
 
+# 将UTC时间字符串解析为 (UTC时间, 北京时间格式化字符串)
+def parse_match_time(plan_started_at):
+    if not plan_started_at:
+        return None, None
+    try:
+        # 解析形如'2025-05-21T06:20:00Z'格式时间
+        utc_time = datetime.strptime(plan_started_at, "%Y-%m-%dT%H:%M:%SZ")
+    except ValueError as e:
+        schedule_log.warning('时间解析错误: %s', e)
+        return None, plan_started_at
+    # 转换为北京时间
+    beijing_time = pytz.utc.localize(utc_time).astimezone(BEIJING_TZ)
+    return utc_time, beijing_time.strftime("%Y-%m-%d %H:%M")
+
+# 从比赛的一方中提取队伍信息
+def extract_match_side(match, side_key):
+    side = match.get(side_key) or {}
+    player = side.get('player') or {}
+    team = player.get('team') or {}
+    return {
+        'team_name': team.get('name', ''),
+        'college': team.get('collegeName', ''),
+        'logo': team.get('collegeLogo', ''),
+        'rank': player.get('rank'),
+    }
+
+# 数据源文件的内容摘要：path -> (文件签名, sha256)
+_feed_file_digests = {}
+
+def feed_file_digest(path):
+    """返回文件内容的 sha256（文件未变化时直接使用上次的结果），文件不存在时为空字符串"""
+    try:
+        signature = FeedCache._signature(path)
+    except FileNotFoundError:
+        return ''
+    cached = _feed_file_digests.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    digest = file_sha256(path)
+    _feed_file_digests[path] = (signature, digest)
+    return digest
+
+# 已导入数据库的赛程/回放数据内容摘要
+_ingested_schedule_digests = None
+_ingest_lock = threading.Lock()
+
+def ingest_schedule(digests=None):
+    """将赛程与回放数据整理为 ScheduleMatch / ScheduleMatchSide 表（整体替换，单个事务）"""
+    schedule = feed_cache.get(SCHEDULE_DATA_FILE)
+    replay_links = feed_cache.get(REPLAY_DATA_FILE) if os.path.exists(REPLAY_DATA_FILE) else {}
+    title = schedule['title']
+
+    match_rows = []
+    side_rows = []
+    seen_ids = set()
+    for position, match in enumerate(schedule['matches']):
+        match_id = str(match.get('id'))
+        if match_id in seen_ids:
+            continue
+        seen_ids.add(match_id)
+
+        started_at, formatted_time = parse_match_time(match.get('planStartedAt'))
+        # 如果比赛在七月之前则在title后面添加分区赛，否则为全国赛
+        division = ''
+        if started_at is not None:
+            division = " - 分区赛" if started_at.month < 7 else " - 全国总决赛与复活赛"
+
+        match_rows.append({
+            'id': match_id,
+            'position': position,
+            'title': title + division,
+            'match_type': match.get('matchType', 'GROUP'),
+            'status': match.get('status'),
+            'result': match.get('result'),
+            'plan_game_count': match.get('planGameCount', 3),
+            'plan_started_at': match.get('planStartedAt'),
+            'started_at': started_at,
+            'formatted_time': formatted_time,
+            'red_score': match.get('redSideScore', 0),
+            'red_win_count': match.get('redSideWinGameCount', 0),
+            'blue_score': match.get('blueSideScore', 0),
+            'blue_win_count': match.get('blueSideWinGameCount', 0),
+            'replay_url': replay_links.get(match_id, '#'),
+        })
+        for side, side_key in (('RED', 'redSide'), ('BLUE', 'blueSide')):
+            side_rows.append(dict(extract_match_side(match, side_key), match_id=match_id, side=side))
+
+    db.session.execute(ScheduleMatchSide.__table__.delete())
+    db.session.execute(ScheduleMatch.__table__.delete())
+    if match_rows:
+        db.session.execute(ScheduleMatch.__table__.insert(), match_rows)
+        db.session.execute(ScheduleMatchSide.__table__.insert(), side_rows)
+    if digests is not None:
+        db.session.merge(AppMeta(key='schedule_feed_digests', value=json.dumps(digests)))
+    db.session.commit()
+    schedule_log.info('赛程数据导入完成: %d 场比赛', len(match_rows))
+
+def ensure_schedule_ingested():
+    """赛程或回放数据内容变化时重新导入"""
+    global _ingested_schedule_digests
+    if not os.path.exists(SCHEDULE_DATA_FILE):
+        return
+    # 缓存版本号每个进程都从1开始，跨进程/重启后的比较必须使用内容摘要；
+    # 只对文件求摘要，数据库已是最新时不需要解析赛程文件
+    digests = [feed_file_digest(SCHEDULE_DATA_FILE), feed_file_digest(REPLAY_DATA_FILE)]
+    if digests == _ingested_schedule_digests:
+        return
+    with _ingest_lock:
+        if digests != _ingested_schedule_digests:
+            # 多进程部署时，其他进程可能已经导入过同一份数据
+            stored = db.session.get(AppMeta, 'schedule_feed_digests')
+            if stored is None or json.loads(stored.value) != digests:
+                ingest_schedule(digests)
+            _ingested_schedule_digests = digests
+
+# 一次查询取出若干学校参与的所有比赛及双方信息（college 上有索引），按开赛时间倒序
+def query_college_matches(colleges):
+    red = aliased(ScheduleMatchSide)
+    blue = aliased(ScheduleMatchSide)
+    match_ids = db.session.query(ScheduleMatchSide.match_id).filter(ScheduleMatchSide.college.in_(colleges))
+    return (db.session.query(ScheduleMatch, red, blue)
+            .join(red, db.and_(red.match_id == ScheduleMatch.id, red.side == 'RED'))
+            .join(blue, db.and_(blue.match_id == ScheduleMatch.id, blue.side == 'BLUE'))
+            .filter(ScheduleMatch.id.in_(match_ids))
+            .order_by(ScheduleMatch.started_at.desc(), ScheduleMatch.position)
+            .all())
+
+# 以某个学校的视角整理一场比赛（是否红方、是否获胜）
+def build_match_info(match, red_side, blue_side, college):
+    match_info = {
+        'id': match.id,
+        'title': match.title,
+        'match_type': match.match_type,
+        'status': match.status,
+        'result': match.result,
+        'plan_game_count': match.plan_game_count,
+        'start_time': match.plan_started_at,
+        'planStartedAt': match.plan_started_at,
+        'formatted_time': match.formatted_time,
+        
+        # 红方信息
+        'red_team': {
+            'name': red_side.team_name,
+            'college': red_side.college,
+            'logo': red_side.logo,
+            'rank': red_side.rank
+        },
+        'red_score': match.red_score,
+        'red_win_count': match.red_win_count,
+        
+        # 蓝方信息
+        'blue_team': {
+            'name': blue_side.team_name,
+            'college': blue_side.college,
+            'logo': blue_side.logo,
+            'rank': blue_side.rank
+        },
+        'blue_score': match.blue_score,
+        'blue_win_count': match.blue_win_count,
+        'replay_url': match.replay_url,
+    }
+    
+    # 判断是否是本队伍的比赛
+    if red_side.college == college:
+        match_info['is_red'] = True
+        if match.result == 'RED':
+            match_info['is_win'] = True
+        elif match.result == 'BLUE':
+            match_info['is_win'] = False
+    else:
+        match_info['is_red'] = False
+        if match.result == 'BLUE':
+            match_info['is_win'] = True
+        elif match.result == 'RED':
+            match_info['is_win'] = False
+    return match_info
+
 # 查看队伍赛程
 @app.route('/team_schedule/<int:id>')
 @login_required
@@ -648,180 +2730,22 @@ def team_schedule(id):
     if id == 1:
         team.school = "中国科学技术大学" 
     
-    # 获取回放数据
-    replay_links = {}
-    try:
-        if os.path.exists(REPLAY_DATA_FILE):
-            with open(REPLAY_DATA_FILE, 'r', encoding='utf-8') as f:
-                replay_json = json.load(f)
-                
-            # 提取回放链接 - 直接使用ID为键
-            if 'simple_cms' in replay_json:
-                for item in replay_json.get('simple_cms', []):
-                    if item.get('is_active', False):
-                        content = item.get('content', {})
-                        main_remote_url = content.get('main_remote_url', '')
-                        # 使用item的id作为键，这个id应与比赛id匹配
-                        match_id = str(item.get("content").get("match_id", ""))  # 确保获取到正确的比赛ID
-                        if not match_id:
-                            continue
-                        if match_id and main_remote_url:
-                            replay_links[match_id] = main_remote_url
-                            # print(f"找到回放链接: ID={match_id}, URL={main_remote_url}")
-    except Exception as e:
-        print(f"解析回放数据错误: {str(e)}")
-    
-    # print(f"所有回放链接: {replay_links}")
-    
-    # 从JSON文件获取赛程数据
     schedule_data = []
     try:
-        if os.path.exists(SCHEDULE_DATA_FILE):
-            with open(SCHEDULE_DATA_FILE, 'r', encoding='utf-8') as f:
-                schedule_json = json.load(f)
-                
-            # 解析JSON数据，提取所有比赛
-            all_matches = []
-            
-            # 检查必要的字段是否存在
-            if ('data' in schedule_json and 
-                'event' in schedule_json.get('data', {}) and 
-                'zones' in schedule_json.get('data', {}).get('event', {})):
-                
-                # 修复: 确保zones不是None，且安全地获取nodes
-                zones_data = schedule_json['data']['event']['zones']
-                title = schedule_json['data']['event'].get('title', '未知赛事')
-                
-                print(f"正在处理赛事: {title}")
-                if zones_data is not None:
-                    zones = zones_data.get('nodes', [])
-                else:
-                    zones = []
-                
-                for zone in zones:
-                    # 获取小组赛 - 确保安全访问
-                    group_matches = zone.get('groupMatches', {})
-                    if group_matches is not None:
-                        all_matches.extend(group_matches.get('nodes', []))
-                    
-                    # 获取淘汰赛 - 确保安全访问
-                    knockout_matches = zone.get('knockoutMatches', {})
-                    if knockout_matches is not None:
-                        all_matches.extend(knockout_matches.get('nodes', []))
-            
-            # 找出与当前队伍相关的比赛
-            team_matches = []
+        ensure_schedule_ingested()
+        
+        for match, red_side, blue_side in query_college_matches([team.school]):
+            match_info = build_match_info(match, red_side, blue_side, team.school)
             
-            for match in all_matches:
-                # 安全获取嵌套字段
-                red_side = {}
-                blue_side = {}
-                
-                if match.get('redSide') and match['redSide'].get('player') and match['redSide']['player'].get('team'):
-                    red_side = match['redSide']['player']['team']
-                
-                if match.get('blueSide') and match['blueSide'].get('player') and match['blueSide']['player'].get('team'):
-                    blue_side = match['blueSide']['player']['team']
-                
-                # 检查队伍名称和学校名称是否匹配
-                if (red_side.get('collegeName') == team.school or blue_side.get('collegeName') == team.school):
-                    # 基本赛事信息
-                    # 解析形如'2025-05-21T06:20:00Z'格式时间
-                    time = match.get('planStartedAt', '')
-                    if time:
-                        from datetime import datetime
-                        time = datetime.strptime(time, "%Y-%m-%dT%H:%M:%SZ")
-                    division = ''
-                    # 如果time的月份在七月之前则在title后面添加一个分区赛
-                    if time.month < 7:
-                        division = " - 分区赛"
-                    else:
-                        division += " - 全国总决赛与复活赛"
-                    match_info = {
-                        'id': match.get('id'),
-                        'title': title + division,
-                        'match_type': match.get('matchType', 'GROUP'),
-                        'status': match.get('status'),
-                        'result': match.get('result'),
-                        'plan_game_count': match.get('planGameCount', 3),
-                        'start_time': match.get('planStartedAt'),
-                        'planStartedAt': match.get('planStartedAt'),
-                        
-                        # 红方信息
-                        'red_team': {
-                            'name': red_side.get('name', ''),
-                            'college': red_side.get('collegeName', ''),
-                            'logo': red_side.get('collegeLogo', ''),
-                            'rank': match.get('redSide', {}).get('player', {}).get('rank') if match.get('redSide') and match.get('redSide', {}).get('player') else None
-                        },
-                        'red_score': match.get('redSideScore', 0),
-                        'red_win_count': match.get('redSideWinGameCount', 0),
-                        
-                        # 蓝方信息
-                        'blue_team': {
-                            'name': blue_side.get('name', ''),
-                            'college': blue_side.get('collegeName', ''),
-                            'logo': blue_side.get('collegeLogo', ''),
-                            'rank': match.get('blueSide', {}).get('player', {}).get('rank') if match.get('blueSide') and match.get('blueSide', {}).get('player') else None
-                        },
-                        'blue_score': match.get('blueSideScore', 0),
-                        'blue_win_count': match.get('blueSideWinGameCount', 0),
-                    }
-                    
-                    # 判断是否是本队伍的比赛
-                    if red_side.get('collegeName') == team.school:
-                        match_info['is_red'] = True
-                        if match.get('result') == 'RED':
-                            match_info['is_win'] = True
-                        elif match.get('result') == 'BLUE':
-                            match_info['is_win'] = False
-                    else:
-                        match_info['is_red'] = False
-                        if match.get('result') == 'BLUE':
-                            match_info['is_win'] = True
-                        elif match.get('result') == 'RED':
-                            match_info['is_win'] = False
-                    
-                    # 格式化时间 (UTC转本地时间)
-                    if match_info['start_time']:
-                        try:
-                            from datetime import datetime
-                            import pytz
-                            # 解析UTC时间
-                            utc_time = datetime.strptime(match_info['start_time'], "%Y-%m-%dT%H:%M:%SZ")
-                            # 添加时区信息
-                            utc_time = pytz.utc.localize(utc_time)
-                            # 转换为北京时间
-                            beijing_tz = pytz.timezone('Asia/Shanghai')
-                            beijing_time = utc_time.astimezone(beijing_tz)
-                            # 格式化
-                            match_info['formatted_time'] = beijing_time.strftime("%Y-%m-%d %H:%M")
-                            # 获取比赛的起始日
-
-
-                        except Exception as e:
-                            print(f"时间解析错误: {e}")
-                            match_info['formatted_time'] = match_info['start_time']
-                            match_info['day_number'] = "?"
-                    
-                    # 添加回放链接到match_info
-                    match_id = str(match.get('id'))
-                    match_info['replay_url'] = replay_links.get(match_id, '#')
-                    
-                    if match_info['replay_url'] != '#':
-                        print(f"找到比赛{match_id}的回放: {match_info['replay_url']}")
-                    else:
-                        print(f"未找到比赛{match_id}的回放")
-                    
-                    team_matches.append(match_info)
+            # 逐场比赛的调试日志默认不输出（级别为 DEBUG），开启后也受频率限制
+            if match_info['replay_url'] != '#':
+                schedule_log.debug('找到比赛%s的回放: %s', match.id, match_info['replay_url'])
+            else:
+                schedule_log.debug('未找到比赛%s的回放', match.id)
             
-            # 按时间排序
-            team_matches.sort(key=lambda x: x.get('start_time', ''), reverse=True)
-            schedule_data = team_matches
+            schedule_data.append(match_info)
     except Exception as e:
-        print(f"解析赛程数据错误: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        schedule_log.exception('解析赛程数据错误: %s', e)
     
     return render_template('team_schedule.html', team=team, matches=schedule_data)
 
@@ -845,96 +2769,26 @@ def team_ranking():
         # if not os.path.exists(GROUP_RANK_FILE):
         #     download_robot_data()
         
-        # 读取积分榜数据
-        with open(GROUP_RANK_FILE, 'r', encoding='utf-8') as f:
-            rank_data = json.load(f)
-        
-        # 处理和整理数据
-        zones_data = []
-        
-        for zone in rank_data.get('zones', []):
-            zone_info = {
-                'name': zone.get('zoneName', '未知赛区'),
-                'groups': []
-            }
-            
-            for group in zone.get('groups', []):
-                group_info = {
-                    'name': group.get('groupName', '未知小组'),
-                    'teams': []
-                }
-                # 获取队伍信息
-                teams = []
-                for player in group.get('groupPlayers', []):
-                    # 创建队伍数据结构
-                    team = {}
-                    # 从项目中提取数据
-                    for item in player:
-                        item_name = item.get('itemName', '')
-                        item_value = item.get('itemValue', '')
-                        
-                        if item_name == '战队':
-                            team['collegeName'] = item_value.get('collegeName', '未知学校')
-                            team['teamName'] = item_value.get('teamName', '未知战队')
-                            team['collegeLogo'] = item_value.get('collegeLogo', '')
-                        elif item_name == '胜/平/负':
-                            team['record'] = item_value
-                            # 从胜/平/负中提取负场数
-                            if isinstance(item_value, str) and '/' in item_value:
-                                parts = item_value.split('/')
-                                if len(parts) == 3:
-                                    try:
-                                        team['losses'] = int(parts[2])
-                                    except ValueError:
-                                        team['losses'] = 0
-                                else:
-                                    team['losses'] = 0
-                            else:
-                                team['losses'] = 0
-                        elif item_name == '胜场数':
-                            team['wins'] = item_value
-                        elif item_name == '对手分':
-                            team['opponent_score'] = item_value
-                        elif item_name == '局均总基地净胜血量':
-                            team['base_hp_diff'] = item_value
-                        elif item_name == '局均总前哨站净胜血量':
-                            team['outpost_hp_diff'] = item_value
-                        elif item_name == '局均全队总伤害血量':
-                            team['total_damage'] = item_value
-                    
-                    if team:
-                        teams.append(team)
-                
-                # 按照新优先级排序：胜场数、负场数（越少越靠前）、对手分、局均总基地净胜血量、局均总前哨站净胜血量、局均全队总伤害血量
-                teams.sort(key=lambda x: (
-                    x.get('wins', 0),  # 胜场数（降序）
-                    -x.get('losses', 0),  # 负场数（升序）
-                    x.get('opponent_score', 0),  # 对手分（降序）
-                    x.get('base_hp_diff', 0),  # 局均总基地净胜血量（降序）
-                    x.get('outpost_hp_diff', 0),  # 局均总前哨站净胜血量（降序）
-                    x.get('total_damage', 0)  # 局均全队总伤害血量（降序）
-                ), reverse=True)
-                
-                group_info['teams'] = teams
-                zone_info['groups'].append(group_info)
-            
-            zones_data.append(zone_info)
-        
-        # 获取系统中的所有队伍作为查找字典
-        team_dict = {}
-        teams = Team.query.all()
-        for team in teams:
-            team_dict[team.school] = team.id
-        
-        return render_template('team_ranking.html', zones=zones_data, team_dict=team_dict)
+        # 积分榜文件签名也作为缓存键，文件被直接替换时同样失效
+        return cached_page('team_ranking', render_team_ranking, FeedCache._signature(GROUP_RANK_FILE))
     
     except Exception as e:
         flash(f'加载积分榜数据时出错: {str(e)}', 'error')
-        print(f"加载积分榜数据错误: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        ranking_log.exception('加载积分榜数据错误: %s', e)
         return redirect(url_for('index'))
 
+def render_team_ranking():
+    # 读取积分榜数据（已按小组排好序）
+    zones_data = feed_cache.get(GROUP_RANK_FILE)
+    
+    # 获取系统中的所有队伍作为查找字典
+    team_dict = {}
+    teams = Team.query.all()
+    for team in teams:
+        team_dict[team.school] = team.id
+    
+    return render_template('team_ranking.html', zones=zones_data, team_dict=team_dict)
+
 # 添加静态数据路由
 @app.route('/robot_data.json')
 def serve_robot_data():
@@ -942,8 +2796,7 @@ def serve_robot_data():
     # if not os.path.exists(ROBOT_DATA_FILE):
     #     download_robot_data()
     
-    # 从静态文件目录提供文件
-    return redirect(url_for('static', filename='data/robot_data.json'))
+    return serve_feed_file(ROBOT_DATA_FILE)
 
 @app.route('/schedule.json')
 def serve_schedule_data():
@@ -951,100 +2804,594 @@ def serve_schedule_data():
     # if not os.path.exists(SCHEDULE_DATA_FILE):
     #     download_robot_data()
     
-    # 从静态文件目录提供文件
-    return redirect(url_for('static', filename='data/schedule.json'))
+    return serve_feed_file(SCHEDULE_DATA_FILE)
+
+# 单个学校的机器人数据与排名（替代前端下载完整 robot_data.json 自行计算）
+@app.route('/api/robot_rankings')
+@login_required
+def robot_rankings():
+    college_name = request.args.get('college', '')
+    try:
+        return jsonify(get_college_robot_rankings(college_name))
+    except FileNotFoundError:
+        return jsonify({'version': 0, 'robot_types': [], 'team': None, 'robots': []})
+
+# 记录历史的数值指标（KDA 字符串除外，KDA 得分已在 eagKdaScore 中）
+HISTORY_METRIC_FIELDS = [field for field in ROBOT_METRIC_FIELDS if field != 'eaKDA']
+
+def metric_vector(robot):
+    return [float(robot[field]) if isinstance(robot.get(field), (int, float)) else np.nan
+            for field in HISTORY_METRIC_FIELDS]
+
+def decode_metric_values(blob):
+    """解码数据点；旧数据点字段较少时末尾补 NaN"""
+    values = np.frombuffer(blob, dtype=np.float32)
+    if len(values) < len(HISTORY_METRIC_FIELDS):
+        values = np.concatenate([values, np.full(len(HISTORY_METRIC_FIELDS) - len(values), np.nan, dtype=np.float32)])
+    return values[:len(HISTORY_METRIC_FIELDS)]
+
+# 追加一个 robot_data 快照：与每个机器人上一次的指标比较，只写入有变化的机器人（单个事务）；
+# 没有任何变化时不写入，历史大小只随数据变化增长，与下载频率无关
+def append_robot_snapshot(data, taken_at=None):
+    robots = {}
+    for zone in data.get('zones', []):
+        for team in zone.get('teams', []):
+            for robot in team.get('robots') or []:
+                if robot.get('id') is not None and robot['id'] not in robots:
+                    robots[robot['id']] = (team, robot)
+    if not robots:
+        return None
+    
+    taken_at = (taken_at or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(tzinfo=None)
+    robot_ids = sorted(robots)
+    matrix = np.array([metric_vector(robots[robot_id][1]) for robot_id in robot_ids], dtype=np.float32)
+    known = dict(db.session.query(RobotHistoryRobot.robot_id, RobotHistoryRobot.last_values))
+    
+    point_rows, new_robots, updated_robots = [], [], []
+    for robot_id, values in zip(robot_ids, matrix):
+        blob = values.tobytes()
+        previous = known.get(robot_id)
+        if previous == blob:
+            continue
+        point_rows.append({'robot_id': robot_id, 'taken_at': taken_at, 'values': blob})
+        team, robot = robots[robot_id]
+        if previous is None:
+            new_robots.append({
+                'robot_id': robot_id,
+                'college': team.get('collegeName'),
+                'team_name': team.get('name'),
+                'robot_type': robot.get('type'),
+                'robot_number': robot.get('robotNumber'),
+                'last_values': blob,
+            })
+        else:
+            updated_robots.append({'b_robot_id': robot_id, 'b_last_values': blob})
+    
+    if not point_rows:
+        history_log.debug('机器人数据无变化，不记录快照: %d 个机器人', len(robot_ids))
+        return None
+    
+    snapshot = RobotSnapshot(taken_at=taken_at, robot_count=len(robot_ids), changed_count=len(point_rows))
+    db.session.add(snapshot)
+    db.session.flush()
+    for row in point_rows:
+        row['snapshot_id'] = snapshot.id
+    db.session.execute(RobotMetricPoint.__table__.insert(), point_rows)
+    if new_robots:
+        db.session.execute(RobotHistoryRobot.__table__.insert(), new_robots)
+    if updated_robots:
+        table = RobotHistoryRobot.__table__
+        db.session.execute(
+            table.update()
+            .where(table.c.robot_id == db.bindparam('b_robot_id'))
+            .values(last_values=db.bindparam('b_last_values')),
+            updated_robots
+        )
+    db.session.commit()
+    history_log.info('记录机器人数据快照: %d 个机器人，%d 个有变化', len(robot_ids), len(point_rows))
+    return snapshot.id
+
+def parse_history_time(value):
+    """解析 ISO 8601 时间参数，统一为不带时区的 UTC 时间（与数据库中的存储一致）"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+# 查询机器人的指标序列；指定 start 时额外带上 start 之前的最后一个数据点，作为区间起点的取值
+def get_robot_metric_history(robot_ids, fields=None, start=None, end=None):
+    fields = fields or HISTORY_METRIC_FIELDS
+    columns = [HISTORY_METRIC_FIELDS.index(field) for field in fields]
+    robot_ids = list(robot_ids)
+    
+    query = db.session.query(RobotMetricPoint.robot_id, RobotMetricPoint.taken_at, RobotMetricPoint.values)
+    query = query.filter(RobotMetricPoint.robot_id.in_(robot_ids))
+    if start is not None:
+        query = query.filter(RobotMetricPoint.taken_at >= start)
+    if end is not None:
+        query = query.filter(RobotMetricPoint.taken_at <= end)
+    rows = query.order_by(RobotMetricPoint.robot_id, RobotMetricPoint.taken_at).all()
+    
+    if start is not None:
+        latest = (db.session.query(RobotMetricPoint.robot_id, db.func.max(RobotMetricPoint.taken_at).label('taken_at'))
+                  .filter(RobotMetricPoint.robot_id.in_(robot_ids), RobotMetricPoint.taken_at < start)
+                  .group_by(RobotMetricPoint.robot_id).subquery())
+        rows = (db.session.query(RobotMetricPoint.robot_id, RobotMetricPoint.taken_at, RobotMetricPoint.values)
+                .join(latest, db.and_(RobotMetricPoint.robot_id == latest.c.robot_id,
+                                      RobotMetricPoint.taken_at == latest.c.taken_at))
+                .all()) + rows
+        rows.sort(key=lambda row: (row[0], row[1]))
+    
+    meta = {robot.robot_id: robot for robot in RobotHistoryRobot.query.filter(RobotHistoryRobot.robot_id.in_(robot_ids))}
+    grouped = {}
+    for robot_id, taken_at, blob in rows:
+        entry = grouped.setdefault(robot_id, ([], []))
+        entry[0].append(taken_at)
+        entry[1].append(decode_metric_values(blob))
+    
+    result = []
+    for robot_id in robot_ids:
+        if robot_id not in grouped:
+            continue
+        times, vectors = grouped[robot_id]
+        matrix = np.vstack(vectors)[:, columns].astype(np.float64)
+        robot = meta.get(robot_id)
+        result.append({
+            'robot_id': robot_id,
+            'type': robot.robot_type if robot else None,
+            'robot_number': robot.robot_number if robot else None,
+            't': [taken_at.replace(tzinfo=timezone.utc).isoformat() for taken_at in times],
+            'series': {
+                field: [None if np.isnan(value) else round(float(value), 4) for value in matrix[:, j]]
+                for j, field in enumerate(fields)
+            },
+        })
+    return result
+
+# 机器人指标历史（趋势图数据）：?college=学校 或 ?robot_id=1&robot_id=2，可选 fields=a,b、start、end（ISO 8601）
+@app.route('/api/robot_history')
+@login_required
+def robot_history():
+    fields = [field for field in request.args.get('fields', '').split(',') if field] or HISTORY_METRIC_FIELDS
+    unknown = [field for field in fields if field not in HISTORY_METRIC_FIELDS]
+    if unknown:
+        return jsonify({'message': '未知的指标', 'unknown_fields': unknown}), 400
+    try:
+        start = parse_history_time(request.args.get('start'))
+        end = parse_history_time(request.args.get('end'))
+    except ValueError:
+        return jsonify({'message': '时间格式错误，应为 ISO 8601'}), 400
+    
+    robot_ids = request.args.getlist('robot_id', type=int)
+    college = request.args.get('college')
+    if college:
+        robot_ids += [robot_id for (robot_id,) in
+                      db.session.query(RobotHistoryRobot.robot_id).filter(RobotHistoryRobot.college == college)]
+    if not robot_ids:
+        return jsonify({'fields': fields, 'robots': []})
+    return jsonify({'fields': fields, 'robots': get_robot_metric_history(robot_ids, fields, start, end)})
+
+# 全局排行榜：?sort=指标&order=desc|asc&page=1&per_page=20&zone=赛区，使用预先排好的下标分页
+@app.route('/api/leaderboard')
+@login_required
+def leaderboard():
+    sort = request.args.get('sort', 'wins')
+    if sort not in LEADERBOARD_METRICS:
+        return jsonify({'message': '不支持的排序指标', 'metrics': LEADERBOARD_METRICS}), 400
+    order = request.args.get('order') or ('asc' if sort in LEADERBOARD_ASCENDING else 'desc')
+    if order not in ('asc', 'desc'):
+        return jsonify({'message': 'order 只能为 asc 或 desc'}), 400
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 200)
+    zone = request.args.get('zone')
+    
+    try:
+        board = feed_cache.derive(GROUP_RANK_FILE, build_leaderboard)
+    except FileNotFoundError:
+        board = {'records': [], 'orders': {(sort, order): []}}
+    indexes = board['orders'][(sort, order)]
+    records = board['records']
+    if zone:
+        indexes = [i for i in indexes if records[i]['zone'] == zone]
+    
+    total = len(indexes)
+    offset = (page - 1) * per_page
+    teams = [dict(records[i], position=offset + n + 1) for n, i in enumerate(indexes[offset:offset + per_page])]
+    return jsonify({
+        'version': feed_cache.version(GROUP_RANK_FILE),
+        'sort': sort,
+        'order': order,
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'pages': (total + per_page - 1) // per_page,
+        'teams': teams,
+    })
+
+# 对手档案：一次请求汇总战术数据、图片、机器人指标、积分榜与历史比赛
+DOSSIER_MAX_TEAMS = 2
+
+def parse_dossier_ids(value):
+    """解析 ids=3,7 形式的队伍ID列表（去重并保持顺序），不合法时返回 None"""
+    try:
+        ids = [int(part) for part in (value or '').split(',') if part.strip()]
+    except ValueError:
+        return None
+    ids = list(dict.fromkeys(ids))
+    if not ids or len(ids) > DOSSIER_MAX_TEAMS:
+        return None
+    return ids
+
+def build_team_dossiers(team_ids):
+    """
+    汇总若干队伍的档案，数据库查询次数固定（队伍、战术数据、图片、比赛各一次），
+    与队伍数量和数据量无关；机器人指标与积分榜来自进程内的数据源缓存。
+    有队伍不存在时返回 None。
+    """
+    teams = {team.id: team for team in Team.query.filter(Team.id.in_(team_ids)).all()}
+    if len(teams) != len(team_ids):
+        return None
+    
+    tactical = {team_id: {category: [] for category, _ in TACTICAL_CATEGORIES} for team_id in team_ids}
+    for data in TacticalData.query.filter(TacticalData.team_id.in_(team_ids)).order_by(TacticalData.id).all():
+        categories = tactical[data.team_id]
+        if data.category in categories:
+            categories[data.category].append({'item': data.item, 'content': data.content or ''})
+    
+    images = {team_id: {category: [] for category, _ in TACTICAL_CATEGORIES} for team_id in team_ids}
+    for img in TeamImage.query.filter(TeamImage.team_id.in_(team_ids)).order_by(TeamImage.id).all():
+        categories = images[img.team_id]
+        if img.robot_type in categories:
+            categories[img.robot_type].append({
+                'id': img.id,
+                'description': img.description or '',
+                'url': image_url(img.filename),
+                'thumb_url': image_url(img.filename, 'thumb'),
+            })
+    
+    try:
+        standings = feed_cache.derive(GROUP_RANK_FILE, build_standing_index)
+    except FileNotFoundError:
+        standings = {}
+    
+    # 与 team_schedule 一致：1号队伍在官方数据中按中国科学技术大学匹配；赛程、机器人数据与积分榜都使用同一个学校名
+    colleges = {team_id: ("中国科学技术大学" if team_id == 1 else teams[team_id].school) for team_id in team_ids}
+    matches = {team_id: [] for team_id in team_ids}
+    head_to_head = []
+    try:
+        ensure_schedule_ingested()
+        for match, red_side, blue_side in query_college_matches(list(set(colleges.values()))):
+            sides = {red_side.college, blue_side.college}
+            for team_id in team_ids:
+                if colleges[team_id] in sides:
+                    matches[team_id].append(build_match_info(match, red_side, blue_side, colleges[team_id]))
+            if len(team_ids) == 2 and colleges[team_ids[0]] in sides and colleges[team_ids[1]] in sides:
+                head_to_head.append(build_match_info(match, red_side, blue_side, colleges[team_ids[0]]))
+    except Exception as e:
+        schedule_log.exception('加载档案赛程数据错误: %s', e)
+    
+    dossiers = []
+    for team_id in team_ids:
+        team = teams[team_id]
+        try:
+            robots = get_college_robot_rankings(colleges[team_id])['robots']
+        except FileNotFoundError:
+            robots = []
+        dossiers.append({
+            'team': {
+                'id': team.id,
+                'school': team.school,
+                'team': team.team,
+                'rank': team.rank,
+                'rank_exam': team.rank_exam,
+                'money': team.money,
+                'group': team.group,
+                'comment': team.comment or '',
+                'missing_count': team.missing_count,
+                'updated_at': team.updated_at.isoformat() if team.updated_at else None,
+            },
+            'tactical': tactical[team_id],
+            'images': images[team_id],
+            'robots': robots,
+            'standing': standings.get(colleges[team_id]),
+            'matches': matches[team_id],
+        })
+    
+    return {
+        'versions': {
+            'robot_data': feed_cache.version(ROBOT_DATA_FILE),
+            'group_rank': feed_cache.version(GROUP_RANK_FILE),
+            'schedule': feed_cache.version(SCHEDULE_DATA_FILE),
+        },
+        'teams': dossiers,
+        'head_to_head': head_to_head,
+    }
+
+@app.route('/api/dossier')
+@login_required
+def dossier_api():
+    team_ids = parse_dossier_ids(request.args.get('ids'))
+    if team_ids is None:
+        return jsonify({'message': f'ids 需要为1到{DOSSIER_MAX_TEAMS}个队伍ID，以逗号分隔'}), 400
+    result = build_team_dossiers(team_ids)
+    if result is None:
+        return jsonify({'message': '队伍不存在'}), 404
+    return jsonify(result)
+
+# 档案页面：供赛前平板一次加载，按数据版本缓存
+@app.route('/dossier')
+@login_required
+def dossier():
+    team_ids = parse_dossier_ids(request.args.get('ids'))
+    if team_ids is None:
+        abort(400)
+    
+    def render():
+        result = build_team_dossiers(team_ids)
+        if result is None:
+            abort(404)
+        return render_template('dossier.html', dossier=result, robot_fields=ROBOT_METRIC_FIELDS)
+    
+    return cached_page('dossier', render, tuple(team_ids), FeedCache._signature(GROUP_RANK_FILE) if os.path.exists(GROUP_RANK_FILE) else None)
+
+# 全文搜索：trigram 分词只能匹配至少3个字符的片段，更短的词（如“英雄”“哨兵”）用 instr 逐行匹配
+SEARCH_MIN_MATCH_LENGTH = 3
+SEARCH_SNIPPET_RADIUS = 24
+# 不支持 FTS5 时，直接在原表上逐行匹配
+SEARCH_FALLBACK_SOURCE = """(
+    SELECT id AS rowid, content, 'tactical' AS kind, team_id, category, item FROM tactical_data
+    WHERE content IS NOT NULL AND content != ''
+    UNION ALL
+    SELECT -id, comment, 'comment', id, '备注', '' FROM team
+    WHERE comment IS NOT NULL AND comment != ''
+)"""
+
+# 是否存在全文索引表：None 表示尚未检查；检查结果（包括不存在）一直沿用，重建索引时重置
+_search_index_available = None
+
+def search_index_available():
+    global _search_index_available
+    if _search_index_available is None:
+        _search_index_available = db.session.execute(
+            db.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")
+        ).first() is not None
+    return _search_index_available
+
+def search_snippet(content, terms):
+    """截取第一个命中词附近的文本，转义后用 <mark> 标出所有命中词"""
+    lowered = content.lower()
+    positions = [lowered.find(term.lower()) for term in terms]
+    first = min((pos for pos in positions if pos >= 0), default=0)
+    start = max(first - SEARCH_SNIPPET_RADIUS, 0)
+    end = min(first + SEARCH_SNIPPET_RADIUS * 2, len(content))
+    text = content[start:end]
+    pattern = re.compile('|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    parts = []
+    last = 0
+    for match in pattern.finditer(text):
+        parts.append(str(escape(text[last:match.start()])))
+        parts.append(f"<mark>{escape(match.group())}</mark>")
+        last = match.end()
+    parts.append(str(escape(text[last:])))
+    return ('…' if start > 0 else '') + ''.join(parts) + ('…' if end < len(content) else '')
+
+def search_tactical_data(query, limit=20, team_id=None):
+    """搜索战术数据与队伍备注，按 bm25 相关度排序（只有短词时按队伍排序）"""
+    terms = list(dict.fromkeys(query.split()))
+    if not terms:
+        return []
+    use_index = search_index_available()
+    source = 'search_index' if use_index else SEARCH_FALLBACK_SOURCE + ' AS search_index'
+    match_terms = [term for term in terms if len(term) >= SEARCH_MIN_MATCH_LENGTH] if use_index else []
+    
+    conditions = []
+    params = {'limit': limit}
+    if match_terms:
+        conditions.append("search_index MATCH :match")
+        params['match'] = ' '.join('"' + term.replace('"', '""') + '"' for term in match_terms)
+    for i, term in enumerate(term for term in terms if term not in match_terms):
+        conditions.append(f"instr(lower(search_index.content), lower(:term{i})) > 0")
+        params[f'term{i}'] = term
+    if team_id is not None:
+        conditions.append("search_index.team_id = :team_id")
+        params['team_id'] = team_id
+    order = "bm25(search_index)" if match_terms else "search_index.team_id, search_index.rowid"
+    score = "bm25(search_index)" if match_terms else "NULL"
+    
+    rows = db.session.execute(db.text(
+        f"SELECT search_index.content, search_index.kind, search_index.team_id, search_index.category, "
+        f"search_index.item, team.school, team.team, {score} AS score "
+        f"FROM {source} JOIN team ON team.id = search_index.team_id "
+        f"WHERE {' AND '.join(conditions)} ORDER BY {order} LIMIT :limit"
+    ), params).all()
+    return [{
+        'kind': row.kind,
+        'team_id': row.team_id,
+        'school': row.school,
+        'team': row.team,
+        'category': row.category,
+        'item': row.item,
+        'snippet': search_snippet(row.content, terms),
+        # bm25 越小越相关，取负数使分数越大越相关；不做舍入，分数很小时舍入会丢失排序
+        'score': None if row.score is None else -row.score,
+        'url': url_for('view_team', id=row.team_id),
+    } for row in rows]
+
+# 搜索战术数据与队伍备注：?q=关键词（空格分隔，需全部命中）&limit=20&team_id=可选
+@app.route('/api/search')
+@login_required
+def search():
+    query = request.args.get('q', '').strip()
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    team_id = request.args.get('team_id', type=int)
+    return jsonify({'query': query, 'hits': search_tactical_data(query, limit, team_id)})
+
+# 最近一次数据源下载结果（状态码、字节数、耗时）
+@app.route('/api/feed_downloads')
+@login_required
+def feed_downloads():
+    return jsonify(feed_download_stats)
+
+# 立即刷新数据源（请求体可用 {"feeds": [...]} 指定，默认全部）
+# 有后台任务进程时把请求交给其调度器并返回 202，结果见 /api/feed_polling；没有时（如关闭了后台任务）在本请求中同步下载
+@app.route('/api/feeds/refresh', methods=['POST'])
+@login_required
+def refresh_feeds():
+    payload = request.get_json(silent=True) or {}
+    names = payload.get('feeds') or request.form.getlist('feeds') or [feed[0] for feed in FEEDS]
+    unknown = [name for name in names if name not in feed_scheduler.feeds]
+    if unknown:
+        return jsonify({'message': '未知的数据源', 'unknown': unknown,
+                        'feeds': list(feed_scheduler.feeds)}), 400
+    if feed_scheduler.running:
+        feed_scheduler.request_refresh(names)
+    elif background_owner_alive():
+        os.makedirs(FEED_REFRESH_FOLDER, exist_ok=True)
+        for name in names:
+            open(os.path.join(FEED_REFRESH_FOLDER, name), 'a').close()
+    else:
+        return jsonify({'results': download_robot_data([feed_scheduler.feeds[name] for name in names])})
+    return jsonify({'requested': names, 'status_url': url_for('feed_polling')}), 202
+
+# 后台轮询状态（由后台任务进程写入文件，任意工作进程均可读取）
+@app.route('/api/feed_polling')
+@login_required
+def feed_polling():
+    try:
+        with open(FEED_POLL_STATUS_FILE, encoding='utf-8') as f:
+            return jsonify(json.load(f))
+    except (FileNotFoundError, ValueError):
+        return jsonify({'running': False, 'live': schedule_is_live(), 'feeds': {}})
+
+# 数据源缓存命中统计
+@app.route('/api/feed_cache_stats')
+@login_required
+def feed_cache_stats():
+    return jsonify(feed_cache.stats())
+
+# 页面渲染缓存命中统计
+@app.route('/api/page_cache_stats')
+@login_required
+def page_cache_stats():
+    return jsonify(page_cache.stats())
+
+# Prometheus 抓取接口：需要已登录，或携带 "Authorization: Bearer <RMINTEL_METRICS_TOKEN>"；
+# 只有显式设置 RMINTEL_METRICS_PUBLIC=1 时才允许匿名访问
+METRICS_TOKEN = os.getenv('RMINTEL_METRICS_TOKEN')
+METRICS_PUBLIC = os.getenv('RMINTEL_METRICS_PUBLIC', '0') == '1'
+
+def metrics_authorized():
+    if METRICS_PUBLIC or 'logged_in' in session:
+        return True
+    return bool(METRICS_TOKEN) and hmac.compare_digest(
+        request.headers.get('Authorization', ''), f'Bearer {METRICS_TOKEN}')
+
+@app.route('/metrics')
+def metrics_endpoint():
+    if not metrics_authorized():
+        return Response('unauthorized\n', status=401, mimetype='text/plain')
+    for filename, stats in feed_cache.stats().items():
+        feed = os.path.splitext(filename)[0]
+        metrics.set('rmintel_feed_cache_hits_total', stats['hits'], feed=feed)
+        metrics.set('rmintel_feed_cache_misses_total', stats['misses'], feed=feed)
+    stats = page_cache.stats()
+    metrics.set('rmintel_page_cache_hits_total', stats['hits'])
+    metrics.set('rmintel_page_cache_misses_total', stats['misses'])
+    metrics.set('rmintel_page_cache_bytes', stats['bytes'])
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
 
 # 添加路由，获取本地缓存的学校 logo
 @app.route('/school_logo/<path:college_name>')
 def serve_school_logo(college_name):
-    # 创建安全的文件名
-    safe_name = ''.join(c if c.isalnum() or c in '_-' else '_' for c in college_name)
+    refresh_logo_index_if_stale()
+    # 创建安全的文件名，并在内存索引中查找匹配的 logo 文件
+    entry = logo_index.get(logo_safe_name(college_name))
     
-    # 查找匹配的 logo 文件
-    for filename in os.listdir(LOGO_FOLDER):
-        name_without_ext = os.path.splitext(filename)[0]
-        if name_without_ext == safe_name:
-            return redirect(url_for('static', filename=f'logos/{filename}'))
+    # 如果找不到匹配的 logo，返回默认图片；该学校的 logo 下载后同一地址就会变成真实图片，
+    # 所以默认图片每次都要重新校验（ETag 未变时只返回 304），不能长期缓存
+    fallback = entry is None
+    if fallback:
+        entry = logo_index.get('default')
+        if entry is None:
+            abort(404)
     
-    # 如果找不到匹配的 logo，返回默认图片
-    return redirect(url_for('static', filename='logos/default.jpg'))
+    response = send_from_directory(os.path.abspath(LOGO_FOLDER), entry['filename'], etag=entry['etag'],
+                                   max_age=0 if fallback else LOGO_CACHE_MAX_AGE, conditional=True)
+    response.cache_control.public = True
+    if fallback:
+        response.cache_control.no_cache = True
+    return response
+
+# 战术数据分类布局的指纹，分类或项目有任何变化时指纹改变
+def tactical_layout_fingerprint():
+    layout = json.dumps(TACTICAL_CATEGORIES, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(layout.encode('utf-8')).hexdigest()
 
 # 同步战术数据分类到数据库
-def sync_tactical_categories():
+def sync_tactical_categories(force=False):
     """
     检查TACTICAL_CATEGORIES是否与数据库匹配，
     若有新增的分类或项目，自动添加到所有队伍的数据中
     若有删除的分类或项目，自动从数据库中删除对应条目
+    新增与删除各用一条SQL语句完成；分类布局指纹未变化时直接跳过
     """
-    print("开始同步战术数据分类...")
+    db_log.info('开始同步战术数据分类...')
     
-    # 获取所有队伍
-    teams = Team.query.all()
-    if not teams:
-        print("没有找到队伍，跳过同步")
+    fingerprint = tactical_layout_fingerprint()
+    stored = db.session.get(AppMeta, 'tactical_layout_fingerprint')
+    if not force and stored is not None and stored.value == fingerprint:
+        db_log.info('战术数据分类布局未变化，跳过同步')
         return
     
-    # 创建一个包含所有当前有效分类-项目组合的集合
-    valid_items = set()
-    for category, items in TACTICAL_CATEGORIES:
-        for item in items:
-            valid_items.add(f"{category}:{item}")
+    # 当前有效的分类-项目组合，作为 SQL 中的 layout(category, item) 临时表
+    layout = [(category, item) for category, items in TACTICAL_CATEGORIES for item in items]
+    db_log.info('当前有效的战术数据条目数量: %d', len(layout))
+    params = {}
+    values = []
+    for i, (category, item) in enumerate(layout):
+        params[f'c{i}'] = category
+        params[f'i{i}'] = item
+        values.append(f"(:c{i}, :i{i})")
+    layout_cte = f"WITH layout(category, item) AS (VALUES {', '.join(values)}) "
+    now = datetime.now(timezone.utc)
     
-    print(f"当前有效的战术数据条目数量: {len(valid_items)}")
+    # 为所有队伍补齐缺少的条目
+    added = db.session.execute(
+        db.text(
+            "INSERT INTO tactical_data (team_id, category, item, content, created_at, updated_at) "
+            + layout_cte +
+            "SELECT team.id, layout.category, layout.item, '', :now, :now FROM team CROSS JOIN layout "
+            "WHERE NOT EXISTS (SELECT 1 FROM tactical_data d "
+            "WHERE d.team_id = team.id AND d.category = layout.category AND d.item = layout.item)"
+        ).bindparams(db.bindparam('now', type_=db.DateTime)),
+        dict(params, now=now)
+    ).rowcount
     
-    # 跟踪已添加和已删除的条目数量
-    total_added = 0
-    total_deleted = 0
+    # 删除已不存在的分类或项目
+    # DELETE 不以 WITH 开头，驱动才能返回正确的删除行数
+    deleted = db.session.execute(
+        db.text(
+            "DELETE FROM tactical_data WHERE (category, item) NOT IN "
+            f"(VALUES {', '.join(values)})"
+        ),
+        params
+    ).rowcount
     
-    for team in teams:
-        # 获取当前队伍的所有战术数据
-        existing_data = TacticalData.query.filter_by(team_id=team.id).all()
-        
-        # 构建字典以快速查找
-        existing_items = {}
-        for data in existing_data:
-            key = f"{data.category}:{data.item}"
-            existing_items[key] = data
-        
-        # 检查是否需要添加新的战术数据条目
-        new_items_added = 0
-        
-        # 对每个分类和项目检查
-        for category, items in TACTICAL_CATEGORIES:
-            for item in items:
-                key = f"{category}:{item}"
-                if key not in existing_items:
-                    # 创建新条目
-                    new_data = TacticalData(
-                        team_id=team.id,
-                        category=category,
-                        item=item,
-                        content=''
-                    )
-                    db.session.add(new_data)
-                    new_items_added += 1
-        
-        # 检查是否需要删除已不存在的战术数据条目
-        items_to_delete = []
-        for key, data in existing_items.items():
-            if key not in valid_items:
-                items_to_delete.append(data)
-        
-        if items_to_delete:
-            for data in items_to_delete:
-                db.session.delete(data)
-                total_deleted += 1
-            print(f"为队伍 {team.school} - {team.team} 删除了 {len(items_to_delete)} 个过期战术数据条目")
-        
-        if new_items_added > 0:
-            print(f"为队伍 {team.school} - {team.team} 添加了 {new_items_added} 个新战术数据条目")
-            total_added += new_items_added
+    if added or deleted:
+        refresh_missing_counts()
     
-    if total_added > 0 or total_deleted > 0:
-        db.session.commit()
-        print(f"战术数据分类同步完成 - 添加了 {total_added} 个条目，删除了 {total_deleted} 个条目")
+    if stored is None:
+        db.session.add(AppMeta(key='tactical_layout_fingerprint', value=fingerprint))
+    else:
+        stored.value = fingerprint
+    db.session.commit()
+    
+    if added or deleted:
+        db_log.info('战术数据分类同步完成 - 添加了 %d 个条目，删除了 %d 个条目', added, deleted)
     else:
-        print("战术数据分类已是最新，无需更新")
+        db_log.info('战术数据分类已是最新，无需更新')
 
 # 同步队伍小组信息
 def sync_team_groups():
@@ -1054,72 +3401,266 @@ def sync_team_groups():
         for team in teams:
             team.group = 'A'
         db.session.commit()
-        print(f"已为{len(teams)}支队伍设置默认小组为A组")
+        db_log.info('已为%d支队伍设置默认小组为A组', len(teams))
+
+# 获取表的列名
+def table_columns(table):
+    result = db.session.execute(db.text(f"PRAGMA table_info({table})")).fetchall()
+    return [row[1] for row in result]  # 第二列是列名
+
+# 迁移1：添加team.group列，设置默认值为'A'
+def migration_add_group_column():
+    if 'group' not in table_columns('team'):
+        db.session.execute(db.text("ALTER TABLE team ADD COLUMN \"group\" VARCHAR(10) DEFAULT 'A'"))
+
+# 迁移2：添加team.missing_count列（缺失条目计数）并回填
+def migration_add_missing_count_column():
+    if 'missing_count' not in table_columns('team'):
+        db.session.execute(db.text("ALTER TABLE team ADD COLUMN missing_count INTEGER"))
+        refresh_missing_counts()
+
+# 迁移3：为按队伍查询的表添加索引，并为战术条目 (team_id, category, item) 添加唯一约束
+def migration_add_indexes():
+    # 先清理重复的战术条目：每组保留有内容的最早一条，都为空时保留最早一条
+    result = db.session.execute(db.text("""
+        DELETE FROM tactical_data WHERE id NOT IN (
+            SELECT COALESCE(MIN(CASE WHEN content IS NOT NULL AND content != '' THEN id END), MIN(id))
+            FROM tactical_data GROUP BY team_id, category, item
+        )
+    """))
+    if result.rowcount:
+        db_log.info('删除了 %d 个重复的战术数据条目', result.rowcount)
+        refresh_missing_counts()
+    db.session.execute(db.text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_tactical_data_cell ON tactical_data (team_id, category, item)"))
+    db.session.execute(db.text(
+        "CREATE INDEX IF NOT EXISTS ix_team_image_team_id ON team_image (team_id)"))
+    db.session.execute(db.text(
+        "CREATE INDEX IF NOT EXISTS ix_team_school_team ON team (school, team)"))
+
+# 迁移4：为战术数据内容与队伍备注建立全文索引（FTS5 trigram 分词，支持中文子串搜索），由触发器在写入时同步
+# rowid：战术数据为 tactical_data.id，队伍备注为 -team.id
+SEARCH_INDEX_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS search_index_tactical_insert AFTER INSERT ON tactical_data
+       WHEN new.content IS NOT NULL AND new.content != '' BEGIN
+           INSERT INTO search_index (rowid, content, kind, team_id, category, item)
+           VALUES (new.id, new.content, 'tactical', new.team_id, new.category, new.item);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS search_index_tactical_update AFTER UPDATE OF content, team_id, category, item ON tactical_data BEGIN
+           DELETE FROM search_index WHERE rowid = old.id;
+           INSERT INTO search_index (rowid, content, kind, team_id, category, item)
+           SELECT new.id, new.content, 'tactical', new.team_id, new.category, new.item
+           WHERE new.content IS NOT NULL AND new.content != '';
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS search_index_tactical_delete AFTER DELETE ON tactical_data BEGIN
+           DELETE FROM search_index WHERE rowid = old.id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS search_index_team_insert AFTER INSERT ON team
+       WHEN new.comment IS NOT NULL AND new.comment != '' BEGIN
+           INSERT INTO search_index (rowid, content, kind, team_id, category, item)
+           VALUES (-new.id, new.comment, 'comment', new.id, '备注', '');
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS search_index_team_update AFTER UPDATE OF comment ON team BEGIN
+           DELETE FROM search_index WHERE rowid = -old.id;
+           INSERT INTO search_index (rowid, content, kind, team_id, category, item)
+           SELECT -new.id, new.comment, 'comment', new.id, '备注', ''
+           WHERE new.comment IS NOT NULL AND new.comment != '';
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS search_index_team_delete AFTER DELETE ON team BEGIN
+           DELETE FROM search_index WHERE rowid = -old.id;
+       END""",
+]
+
+def migration_add_search_index():
+    global _search_index_available
+    _search_index_available = None
+    try:
+        db.session.execute(db.text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+            "content, kind UNINDEXED, team_id UNINDEXED, category UNINDEXED, item UNINDEXED, tokenize='trigram')"
+        ))
+    except Exception as e:
+        # SQLite 未编译 FTS5 或版本低于 3.34（不支持 trigram）时，搜索改为逐行匹配
+        db_log.warning('当前 SQLite 不支持 FTS5 trigram 全文索引，搜索将逐行匹配: %s', e)
+        return
+    db.session.execute(db.text("DELETE FROM search_index"))
+    db.session.execute(db.text("""
+        INSERT INTO search_index (rowid, content, kind, team_id, category, item)
+        SELECT id, content, 'tactical', team_id, category, item FROM tactical_data
+        WHERE content IS NOT NULL AND content != ''
+    """))
+    db.session.execute(db.text("""
+        INSERT INTO search_index (rowid, content, kind, team_id, category, item)
+        SELECT -id, comment, 'comment', id, '备注', '' FROM team
+        WHERE comment IS NOT NULL AND comment != ''
+    """))
+    for trigger in SEARCH_INDEX_TRIGGERS:
+        db.session.execute(db.text(trigger))
+
+def migration_remove_empty_robot_snapshots():
+    # 早期版本每次下载都会记录快照，即使没有任何指标变化
+    db.session.execute(db.text("DELETE FROM robot_snapshot WHERE changed_count = 0"))
 
-# 数据库迁移函数 - 添加在app.py中适当位置（在数据库模型定义之后）
+# 数据库结构版本与对应的迁移函数，版本号保存在 SQLite 的 PRAGMA user_version 中
+# 新增迁移时在末尾追加，版本号递增；迁移函数需要能在已是最新结构的数据库上重复执行
+SCHEMA_MIGRATIONS = [
+    (1, "添加'group'列", migration_add_group_column),
+    (2, "添加'missing_count'列", migration_add_missing_count_column),
+    (3, "添加索引与战术条目唯一约束", migration_add_indexes),
+    (4, "添加战术数据与备注的全文索引", migration_add_search_index),
+    (5, "删除没有数据点的机器人指标快照", migration_remove_empty_robot_snapshots),
+]
+
+# 数据库迁移函数 - 依次执行版本号高于当前数据库版本的迁移
 def migrate_database():
-    """检查数据库结构并进行必要的迁移"""
-    print("检查数据库结构...")
+    """检查数据库结构版本并进行必要的迁移"""
+    db_log.info('检查数据库结构...')
     
-    # 使用原始SQL语句检查team表是否存在group列
     with app.app_context():
-        try:
-            # 获取team表的结构信息
-            result = db.session.execute(db.text("PRAGMA table_info(team)")).fetchall()
-            columns = [row[1] for row in result]  # 第二列是列名
-            
-            # 检查是否存在group列
-            if 'group' not in columns:
-                print("数据库缺少'group'列，正在添加...")
-                # 添加group列，设置默认值为'A'
-                db.session.execute(db.text("ALTER TABLE team ADD COLUMN \"group\" VARCHAR(10) DEFAULT 'A'"))
+        current_version = db.session.execute(db.text("PRAGMA user_version")).scalar()
+        for version, description, migration in SCHEMA_MIGRATIONS:
+            if version <= current_version:
+                continue
+            try:
+                db_log.info('正在执行数据库迁移 %d: %s...', version, description)
+                migration()
+                # 迁移与版本号在同一个事务中提交
+                db.session.execute(db.text(f"PRAGMA user_version = {int(version)}"))
                 db.session.commit()
-                print("成功添加'group'列")
-            else:
-                print("数据库结构检查完成，'group'列已存在")
-                
+                db_log.info('数据库迁移 %d 完成', version)
+            except Exception as e:
+                db_log.exception('数据库迁移错误: %s', e)
+                db.session.rollback()
+                return
+        db_log.info('数据库结构检查完成，当前版本 %d', max(current_version, SCHEMA_MIGRATIONS[-1][0]))
+
+# 初始化数据库（创建表 + 插入测试数据）
+# 后台任务锁与初始化锁：多进程部署时保证后台下载只在一个进程中运行、数据库初始化只执行一次
+BACKGROUND_LOCK_FILE = os.path.join(app.instance_path, 'background.lock')
+INIT_LOCK_FILE = os.path.join(app.instance_path, 'init.lock')
+# 未抢到后台任务锁的进程每隔多少秒重试一次（持锁进程退出后由其他进程接管）
+BACKGROUND_LOCK_RETRY_SECONDS = 60
+# 由后台任务进程运行的线程
+BACKGROUND_TASKS = [background_downloader, background_logo_downloader]
+
+_database_initialized = False
+_background_lock_file = None
+_background_started = False
+_background_start_lock = threading.Lock()
+
+def try_lock_file(lock_file, blocking=False):
+    """对打开的文件加排他锁；没有 fcntl 的平台视为加锁成功"""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        return True
+    except OSError:
+        return False
+
+# 建表、迁移、同步战术数据分类与小组信息、导入赛程
+def init_database():
+    """
+    每个进程只执行一次；多个进程同时启动时通过文件锁串行执行。
+    配合 WSGI 服务器的 preload 可在 fork 出工作进程之前完成。
+    """
+    global _database_initialized
+    if _database_initialized:
+        return
+    os.makedirs(app.instance_path, exist_ok=True)
+    with open(INIT_LOCK_FILE, 'a') as lock_file, app.app_context():
+        try_lock_file(lock_file, blocking=True)
+        db.create_all()
+        
+        # 添加数据库迁移步骤
+        migrate_database()
+        
+        if not Team.query.first():
+            # 插入预定义队伍（含战术数据）
+            bulk_create_teams([
+                {
+                    'school': team_data['school'],
+                    'team': team_data['team'],
+                    'rank': team_data['rank'],
+                    'rank_exam': team_data.get('rank_exam'),
+                    'money': team_data.get('money'),
+                    'comment': team_data.get('comment', ''),
+                    'group': 'A',  # 默认设置为A组
+                }
+                for team_data in PREDEFINED_TEAMS
+            ])
+        else:
+            # 如果已有队伍，检查并同步战术数据分类
+            sync_tactical_categories()
+            # 同步队伍小组信息
+            sync_team_groups()
+        
+        # 还没有机器人指标历史时，用现有的 robot_data.json 作为第一个快照
+        if os.path.exists(ROBOT_DATA_FILE) and RobotSnapshot.query.first() is None:
+            record_robot_snapshot(datetime.fromtimestamp(os.path.getmtime(ROBOT_DATA_FILE), timezone.utc))
+        
+        # 导入赛程数据
+        try:
+            ensure_schedule_ingested()
         except Exception as e:
-            print(f"数据库迁移错误: {str(e)}")
+            schedule_log.exception('导入赛程数据失败: %s', e)
             db.session.rollback()
+        
+        # 关闭初始化时建立的连接，避免 fork 后的工作进程共用同一个 SQLite 连接
+        db.session.remove()
+        db.engine.dispose()
+    _database_initialized = True
 
-# 初始化数据库（创建表 + 插入测试数据）
-with app.app_context():
-    db.create_all()
-    
-    # 添加数据库迁移步骤
-    migrate_database()
-    
-    if not Team.query.first():
-        # 插入预定义队伍
-        for team_data in PREDEFINED_TEAMS:
-            team = Team(
-                school=team_data['school'],
-                team=team_data['team'],
-                rank=team_data['rank'],
-                rank_exam=team_data.get('rank_exam'),
-                money=team_data.get('money'),
-                comment=team_data.get('comment', ''),
-                group='A'  # 默认设置为A组
-            )
-            db.session.add(team)
-            db.session.commit()
-            
-            # 初始化战术数据
-            for category, items in TACTICAL_CATEGORIES:
-                for item in items:
-                    data = TacticalData(
-                        team_id=team.id,
-                        category=category,
-                        item=item,
-                        content=''
-                    )
-                    db.session.add(data)
-        db.session.commit()
-    else:
-        # 如果已有队伍，检查并同步战术数据分类
-        sync_tactical_categories()
-        # 同步队伍小组信息
-        sync_team_groups()
+def run_background_owner():
+    """抢占后台任务锁，成为唯一的后台任务进程后启动各个后台线程"""
+    global _background_lock_file
+    os.makedirs(app.instance_path, exist_ok=True)
+    lock_file = open(BACKGROUND_LOCK_FILE, 'a')
+    while not try_lock_file(lock_file):
+        time.sleep(BACKGROUND_LOCK_RETRY_SECONDS)
+    # 文件保持打开，进程退出时锁自动释放
+    _background_lock_file = lock_file
+    app_log.info('进程 %d 成为后台任务进程', os.getpid())
+    for task in BACKGROUND_TASKS:
+        threading.Thread(target=task, daemon=True).start()
+
+def background_owner_alive():
+    """是否有进程（本进程或其他工作进程）持有后台任务锁"""
+    if _background_lock_file is not None:
+        return True
+    if fcntl is None:
+        return False
+    try:
+        with open(BACKGROUND_LOCK_FILE, 'a') as lock_file:
+            # 能加锁说明没有后台任务进程；关闭文件即释放
+            return not try_lock_file(lock_file)
+    except OSError:
+        return False
+
+# 在当前进程中参与后台任务进程的选举（每个进程只需调用一次）
+def start_background_tasks():
+    global _background_started
+    with _background_start_lock:
+        if _background_started:
+            return
+        _background_started = True
+    threading.Thread(target=run_background_owner, daemon=True).start()
+
+# 应用工厂：python app.py、flask 命令行以及 WSGI 服务器（见 wsgi.py、gunicorn.conf.py）均由此创建应用
+def create_app(start_background=None):
+    """
+    初始化数据库与 logo 索引，并按需参与后台任务进程的选举。
+    start_background 为 None 时读取环境变量 RMINTEL_BACKGROUND_TASKS（默认启动）；
+    预加载应用的 WSGI 主进程应传入 False，在工作进程 fork 后再调用 start_background_tasks()。
+    """
+    init_database()
+    # 每个进程各自建立 logo 索引，后台任务进程下载完成后会再次重建
+    rebuild_logo_index()
+    if start_background is None:
+        start_background = os.getenv('RMINTEL_BACKGROUND_TASKS', '1') != '0'
+    if start_background:
+        start_background_tasks()
+    return app
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=6060, debug=False)
\ No newline at end of file
+    create_app().run(host='0.0.0.0', port=6060, debug=False)
@@ -0,0 +1,61 @@
+"""
+战术数据分类同步的计时基准
+
+在临时数据库中生成 1000 支队伍，分别计时：
+- 分类布局未变化（指纹命中，直接跳过）
+- 强制全量比对（无差异）
+- 分类布局变化（新增一个分类、删除一个项目）
+
+用法: python benchmarks/bench_sync_tactical_categories.py [队伍数量]
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEAM_COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+workdir = tempfile.mkdtemp(prefix='bench_sync_')
+os.environ['RMINTEL_DATABASE_URI'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+import app as rmintel  # noqa: E402
+rmintel.init_database()
+
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"[基准] {label}: {elapsed:.1f} ms")
+    return elapsed
+
+
+with rmintel.app.app_context():
+    existing = rmintel.Team.query.count()
+    rows = [
+        {'school': f'基准大学{i}', 'team': f'BENCH{i}', 'rank': i, 'rank_exam': i, 'money': 0}
+        for i in range(existing, TEAM_COUNT)
+    ]
+    timed(f"生成 {len(rows)} 支队伍", rmintel.bulk_create_teams, rows)
+    print(f"[基准] 队伍数量: {rmintel.Team.query.count()}，"
+          f"战术数据条目: {rmintel.TacticalData.query.count()}")
+
+    timed("首次同步（写入指纹）", rmintel.sync_tactical_categories)
+    timed("布局未变化（指纹跳过）", rmintel.sync_tactical_categories)
+    timed("强制全量比对（无差异）", rmintel.sync_tactical_categories, force=True)
+
+    # 修改分类布局：新增一个分类，删除第一个分类的最后一个项目
+    original = rmintel.TACTICAL_CATEGORIES
+    first_category, first_items = original[0]
+    rmintel.TACTICAL_CATEGORIES = (
+        [(first_category, first_items[:-1])] + original[1:] + [("基准分类", ["项目一", "项目二"])]
+    )
+    timed("布局变化（新增与删除）", rmintel.sync_tactical_categories)
+    rmintel.TACTICAL_CATEGORIES = original
+    timed("恢复原布局", rmintel.sync_tactical_categories)
+    print(f"[基准] 战术数据条目: {rmintel.TacticalData.query.count()}")
+
+print(f"[基准] 临时数据库目录: {workdir}")
@@ -0,0 +1,177 @@
+"""
+多名侦察员同时编辑与浏览的并发负载测试
+
+在进程内用 Flask test client 模拟 N 个编辑者（自动保存战术数据、修改备注）
+和 M 个浏览者（打开首页与队伍详情页），分别在 WAL 与非 WAL（DELETE）模式下运行，
+报告吞吐量、p50/p95 延迟和错误数（如 "database is locked"）。
+
+每种模式在独立子进程中使用各自的临时数据库运行，互不影响。
+
+用法: python benchmarks/load_test_concurrent_scouts.py [--editors 8] [--readers 16] [--duration 10]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run_child(args):
+    """子进程：在指定 journal_mode 下运行负载并以 JSON 输出结果"""
+    workdir = tempfile.mkdtemp(prefix='load_test_')
+    os.environ['RMINTEL_DATABASE_URI'] = 'sqlite:///' + os.path.join(workdir, 'load.db')
+    os.environ['RMINTEL_SQLITE_JOURNAL_MODE'] = args.journal_mode
+    os.environ['RMINTEL_SQLITE_BUSY_TIMEOUT_MS'] = str(args.busy_timeout)
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+    import app as rmintel
+    rmintel.init_database()
+
+    with rmintel.app.app_context():
+        existing = rmintel.Team.query.count()
+        rmintel.bulk_create_teams([
+            {'school': f'负载大学{i}', 'team': f'LOAD{i}', 'rank': i, 'rank_exam': i, 'money': 0}
+            for i in range(existing, args.teams)
+        ])
+        team_ids = [team_id for (team_id,) in rmintel.db.session.query(rmintel.Team.id)]
+        cells = {}
+        for data_id, team_id in rmintel.db.session.query(rmintel.TacticalData.id, rmintel.TacticalData.team_id):
+            cells.setdefault(team_id, []).append(data_id)
+        rmintel.db.session.remove()
+
+    results = {'editor': [], 'reader': []}
+    errors = {'editor': [], 'reader': []}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def new_client():
+        client = rmintel.app.test_client()
+        with client.session_transaction() as sess:
+            sess['logged_in'] = True
+        return client
+
+    def editor(seed):
+        rng = random.Random(seed)
+        client = new_client()
+        latencies, failures = [], []
+        while time.perf_counter() < deadline:
+            team_id = rng.choice(team_ids)
+            start = time.perf_counter()
+            try:
+                if rng.random() < 0.8:
+                    # 自动保存：修改若干个战术数据条目
+                    changes = {str(data_id): f'内容{rng.random():.6f}'
+                               for data_id in rng.sample(cells[team_id], 3)}
+                    response = client.patch(f'/api/team/{team_id}/tactical', json=changes)
+                else:
+                    response = client.post(f'/edit_team/{team_id}', data={'comment': f'备注{rng.random():.6f}'},
+                                           headers={'X-Requested-With': 'XMLHttpRequest'})
+                status = response.status_code
+            except Exception as e:
+                status = repr(e)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                failures.append(str(status))
+        with lock:
+            results['editor'].extend(latencies)
+            errors['editor'].extend(failures)
+
+    def reader(seed):
+        rng = random.Random(seed)
+        client = new_client()
+        latencies, failures = [], []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                if rng.random() < 0.3:
+                    response = client.get('/')
+                else:
+                    response = client.get(f'/view_team/{rng.choice(team_ids)}')
+                status = response.status_code
+            except Exception as e:
+                status = repr(e)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                failures.append(str(status))
+        with lock:
+            results['reader'].extend(latencies)
+            errors['reader'].extend(failures)
+
+    threads = [threading.Thread(target=editor, args=(i,)) for i in range(args.editors)]
+    threads += [threading.Thread(target=reader, args=(1000 + i,)) for i in range(args.readers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    report = {'journal_mode': args.journal_mode, 'seconds': round(elapsed, 2)}
+    for role in ('editor', 'reader'):
+        latencies = results[role]
+        report[role] = {
+            'requests': len(latencies),
+            'throughput': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+            'errors': len(errors[role]),
+            'error_samples': sorted(set(errors[role]))[:3],
+        }
+    print('RESULT ' + json.dumps(report, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='并发侦察员负载测试（WAL 对比）')
+    parser.add_argument('--editors', type=int, default=8, help='并发编辑者数量')
+    parser.add_argument('--readers', type=int, default=16, help='并发浏览者数量')
+    parser.add_argument('--duration', type=float, default=10, help='每种模式运行秒数')
+    parser.add_argument('--teams', type=int, default=50, help='队伍数量')
+    parser.add_argument('--busy-timeout', type=int, default=5000, help='busy_timeout 毫秒数')
+    parser.add_argument('--journal-mode', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.journal_mode:
+        run_child(args)
+        return
+
+    reports = []
+    for mode in ('WAL', 'DELETE'):
+        command = [sys.executable, os.path.abspath(__file__), '--journal-mode', mode,
+                   '--editors', str(args.editors), '--readers', str(args.readers),
+                   '--duration', str(args.duration), '--teams', str(args.teams),
+                   '--busy-timeout', str(args.busy_timeout)]
+        output = subprocess.run(command, capture_output=True, text=True).stdout
+        lines = [line for line in output.splitlines() if line.startswith('RESULT ')]
+        if not lines:
+            print(f"{mode} 模式运行失败")
+            continue
+        reports.append(json.loads(lines[-1][len('RESULT '):]))
+
+    print(f"编辑者 {args.editors}，浏览者 {args.readers}，每种模式 {args.duration} 秒，队伍 {args.teams} 支")
+    print(f"{'模式':<8}{'角色':<8}{'请求数':>8}{'吞吐(次/秒)':>14}{'p50(ms)':>10}{'p95(ms)':>10}{'错误':>6}")
+    for report in reports:
+        for role, label in (('editor', '编辑'), ('reader', '浏览')):
+            r = report[role]
+            print(f"{report['journal_mode']:<8}{label:<8}{r['requests']:>8}{r['throughput']:>14}"
+                  f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['errors']:>6}")
+            if r['error_samples']:
+                print(f"{'':<16}错误示例: {r['error_samples']}")
+
+
+if __name__ == '__main__':
+    main()
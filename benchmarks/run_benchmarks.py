@@ -0,0 +1,275 @@
+"""
+可重复的性能基准套件
+
+对每个规模（相对真实赛季的倍数）在独立子进程中：
+1. 用 synthetic_season 生成四个数据源文件，并在临时数据库中导入队伍、战术数据、备注与图片记录；
+2. 计时应用启动（新进程中 import + init_database + create_app）；
+3. 通过 Flask test client 计时 index、view_team、edit_team POST、team_schedule、team_ranking
+   （首页与积分榜分别计时页面缓存未命中与命中），以及 sync_tactical_categories。
+
+结果（每项的 min/p50/p95/mean 毫秒数、SQL 语句数、响应字节数）写入 JSON 文件；
+p50 超过 thresholds.json 中的上限、SQL 语句数超过上限，或比 --baseline 结果慢超过 --tolerance 时
+记为回归，进程以状态码 1 退出。
+
+用法: python benchmarks/run_benchmarks.py [--scales 1,10,100] [--repeat 20]
+                                          [--output benchmarks/results/latest.json]
+                                          [--thresholds benchmarks/thresholds.json]
+                                          [--baseline 旧结果.json --tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+STARTUP_SNIPPET = (
+    "import time; start = time.perf_counter(); import app; app.init_database(); "
+    "app.create_app(start_background=False); print(f'STARTUP {time.perf_counter() - start:.6f}')"
+)
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+# 与基准结果比较时忽略的绝对差异（毫秒），避免很快的项目因抖动误报
+BASELINE_NOISE_MS = 1.0
+
+
+def percentile(values, q):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def summarize(samples_ms, queries=None, nbytes=None):
+    result = {
+        'n': len(samples_ms),
+        'min_ms': round(min(samples_ms), 3),
+        'p50_ms': round(percentile(samples_ms, 50), 3),
+        'p95_ms': round(percentile(samples_ms, 95), 3),
+        'mean_ms': round(sum(samples_ms) / len(samples_ms), 3),
+        'max_ms': round(max(samples_ms), 3),
+    }
+    if queries is not None:
+        result['queries'] = queries
+    if nbytes is not None:
+        result['bytes'] = nbytes
+    return result
+
+
+def repeat_for(scale, repeat):
+    """规模越大每次越慢，减少重复次数（至少 3 次）"""
+    return max(3, int(round(repeat / max(1.0, scale) ** 0.5)))
+
+
+def run_worker(args):
+    """子进程：生成指定规模的数据并运行所有基准，结果写入 workdir/result.json"""
+    workdir = args.workdir
+    data_folder = os.path.join(workdir, 'data')
+    env = {
+        'RMINTEL_DATABASE_URI': 'sqlite:///' + os.path.join(workdir, 'bench.db'),
+        'RMINTEL_DATA_FOLDER': data_folder,
+        'RMINTEL_BACKGROUND_TASKS': '0',
+    }
+    os.environ.update(env)
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, BENCH_DIR)
+
+    import synthetic_season
+
+    result = {'scale': args.scale, 'seed': args.seed}
+    start = time.perf_counter()
+    result['feed_bytes'] = synthetic_season.write_feeds(data_folder, args.scale, args.seed)
+
+    import app as rmintel
+    rmintel.init_database()
+    with rmintel.app.app_context():
+        result['rows'] = synthetic_season.populate_database(rmintel, args.seed)
+        team_ids = [team_id for (team_id,) in rmintel.db.session.query(rmintel.Team.id)]
+        cells = {}
+        for data_id, team_id in rmintel.db.session.query(rmintel.TacticalData.id, rmintel.TacticalData.team_id):
+            cells.setdefault(team_id, []).append(data_id)
+        rmintel.db.session.remove()
+    result['setup_seconds'] = round(time.perf_counter() - start, 3)
+
+    repeat = repeat_for(args.scale, args.repeat)
+    rng = random.Random(args.seed)
+    benchmarks = {}
+
+    # 应用启动：每次在新进程中计时，数据库已建好（与重启服务的情形一致）
+    startup = []
+    for _ in range(min(repeat, 5)):
+        output = subprocess.run([sys.executable, '-c', STARTUP_SNIPPET], cwd=ROOT, env=dict(os.environ, **env),
+                                capture_output=True, text=True, check=True).stdout
+        startup.append(float(re.search(r'STARTUP ([0-9.]+)', output).group(1)) * 1000)
+    benchmarks['startup'] = summarize(startup)
+
+    client = rmintel.app.test_client()
+    # 与浏览器一致声明支持压缩，bytes 记录的是实际传输的字节数
+    client.environ_base['HTTP_ACCEPT_ENCODING'] = 'gzip, deflate, br'
+    with client.session_transaction() as sess:
+        sess['logged_in'] = True
+
+    def timed_request(name, make_request, before=None, count=repeat):
+        # 预热一次（模板编译等），不计入结果
+        if before is not None:
+            before()
+        make_request(0)
+        samples = []
+        response = None
+        for i in range(count):
+            if before is not None:
+                before()
+            t0 = time.perf_counter()
+            response = make_request(i)
+            samples.append((time.perf_counter() - t0) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f'{name} 返回 {response.status_code}')
+        match = SERVER_TIMING_QUERIES.search(response.headers.get('Server-Timing', ''))
+        benchmarks[name] = summarize(samples, int(match.group(1)) if match else None, len(response.data))
+
+    picks = [rng.choice(team_ids) for _ in range(repeat)]
+    # 先请求一次，排除首次加载数据源与导入赛程的开销（单独计时为 *_first）
+    t0 = time.perf_counter()
+    client.get(f'/team_schedule/{picks[0]}')
+    benchmarks['team_schedule_first'] = summarize([(time.perf_counter() - t0) * 1000])
+
+    timed_request('index_cold', lambda i: client.get('/'), before=rmintel.bump_data_version)
+    timed_request('index_cached', lambda i: client.get('/'))
+    timed_request('view_team', lambda i: client.get(f'/view_team/{picks[i]}'))
+    timed_request('edit_team_post', lambda i: client.post(
+        f'/edit_team/{picks[i]}', headers={'X-Requested-With': 'XMLHttpRequest'},
+        data={f'content_{rng.choice(cells[picks[i]])}': f'基准修改 {i} {rng.random():.6f}'}))
+    timed_request('team_schedule', lambda i: client.get(f'/team_schedule/{picks[i]}'))
+    timed_request('team_ranking_cold', lambda i: client.get('/team_ranking'), before=rmintel.bump_data_version)
+    timed_request('team_ranking_cached', lambda i: client.get('/team_ranking'))
+
+    with rmintel.app.app_context():
+        for name, force, count in (('sync_tactical_categories', False, repeat),
+                                   ('sync_tactical_categories_force', True, min(repeat, 5))):
+            samples = []
+            for _ in range(count):
+                t0 = time.perf_counter()
+                rmintel.sync_tactical_categories(force=force)
+                samples.append((time.perf_counter() - t0) * 1000)
+            benchmarks[name] = summarize(samples)
+
+    result['benchmarks'] = benchmarks
+    with open(os.path.join(workdir, 'result.json'), 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def find_regressions(results, thresholds, baseline, tolerance):
+    regressions = []
+    for scale, scale_result in results['scales'].items():
+        limits = thresholds.get('scales', {}).get(scale, {})
+        previous = (baseline or {}).get('scales', {}).get(scale, {}).get('benchmarks', {})
+        for name, stats in scale_result['benchmarks'].items():
+            limit = limits.get(name, {})
+            if 'p50_ms' in limit and stats['p50_ms'] > limit['p50_ms']:
+                regressions.append(f"{scale}x {name}: p50 {stats['p50_ms']} ms 超过上限 {limit['p50_ms']} ms")
+            if 'max_queries' in limit and stats.get('queries', 0) > limit['max_queries']:
+                regressions.append(f"{scale}x {name}: {stats['queries']} 条 SQL 超过上限 {limit['max_queries']} 条")
+            if name in previous:
+                before = previous[name]['p50_ms']
+                if stats['p50_ms'] > before * (1 + tolerance) and stats['p50_ms'] - before > BASELINE_NOISE_MS:
+                    regressions.append(f"{scale}x {name}: p50 {stats['p50_ms']} ms 比基准 {before} ms "
+                                       f"慢 {(stats['p50_ms'] / before - 1) * 100:.0f}%")
+    return regressions
+
+
+def print_table(results):
+    for scale, scale_result in results['scales'].items():
+        rows = scale_result['rows']
+        print(f"\n== {scale}x：{rows['teams']} 支队伍，{rows['tactical_data']} 个战术条目，"
+              f"数据源 {sum(scale_result['feed_bytes'].values()) / 1024 / 1024:.1f} MB，"
+              f"准备用时 {scale_result['setup_seconds']} 秒 ==")
+        print(f"{'项目':<32}{'p50(ms)':>10}{'p95(ms)':>10}{'min(ms)':>10}{'SQL':>6}{'次数':>6}")
+        for name, stats in scale_result['benchmarks'].items():
+            print(f"{name:<32}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['min_ms']:>10.2f}"
+                  f"{stats.get('queries', ''):>6}{stats['n']:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='战队情报管理系统性能基准')
+    parser.add_argument('--scales', default='1,10,100', help='以逗号分隔的规模倍数')
+    parser.add_argument('--repeat', type=int, default=20, help='1x 规模下每项的重复次数')
+    parser.add_argument('--seed', type=int, default=2025)
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results', 'latest.json'))
+    parser.add_argument('--thresholds', default=os.path.join(BENCH_DIR, 'thresholds.json'))
+    parser.add_argument('--baseline', help='用于比较的历史结果文件')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='相对基准允许变慢的比例')
+    parser.add_argument('--keep', action='store_true', help='保留生成的临时数据目录')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--scale', type=float, help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return 0
+
+    results = {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'scales': {},
+    }
+    for scale_text in args.scales.split(','):
+        scale = float(scale_text)
+        key = f'{scale:g}'
+        workdir = tempfile.mkdtemp(prefix=f'rmintel_bench_{key}x_')
+        print(f"[基准] 运行 {key}x 规模（{workdir}）...", flush=True)
+        try:
+            subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', '--scale', str(scale),
+                            '--workdir', workdir, '--repeat', str(args.repeat), '--seed', str(args.seed)],
+                           cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+            with open(os.path.join(workdir, 'result.json'), encoding='utf-8') as f:
+                results['scales'][key] = json.load(f)
+        finally:
+            if not args.keep:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    thresholds = {}
+    if args.thresholds and os.path.exists(args.thresholds):
+        with open(args.thresholds, encoding='utf-8') as f:
+            thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    results['regressions'] = find_regressions(results, thresholds, baseline, args.tolerance)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    print_table(results)
+    print(f"\n[基准] 结果已写入 {args.output}")
+    if results['regressions']:
+        print("[基准] 发现性能回归:")
+        for line in results['regressions']:
+            print(f"  - {line}")
+        return 1
+    print("[基准] 未发现性能回归")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""
+合成赛季数据生成器
+
+按真实赛季的结构生成 robot_data.json、schedule.json、simple_cms.json、group_rank_info.json，
+字段与官方数据源一致，规模可按倍数放大（1x 约等于一个真实赛季：8 个赛区、每赛区 2 个小组共 32 支队伍、
+约 50 场比赛，其中约 21 支队伍有机器人数据）。同一 seed 生成的数据完全相同。
+
+数据库部分通过应用自身的 import_teams_from_robot_data 导入队伍，再按比例填写战术数据、备注与图片记录。
+
+用法: python benchmarks/synthetic_season.py --scale 10 --out /tmp/season10 [--seed 2025]
+"""
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+ZONES_PER_SCALE = 8
+GROUP_NAMES = ['A', 'B']
+TEAMS_PER_GROUP = 16
+ROBOT_TEAMS_PER_ZONE = 21
+GROUP_MATCHES_PER_GROUP = 18
+KNOCKOUT_MATCHES_PER_ZONE = 14
+ROBOT_TYPES = ['Infantry', 'Hero', 'Sapper', 'Airplane', 'Guard', 'Dart', 'Radar']
+ZONE_NAMES = ['南部赛区', '东部赛区', '中部赛区', '北部赛区', '西部赛区', '东北赛区', '复活赛', '全国赛']
+KNOCKOUT_SLUGS = ['16进8淘汰赛', '8进4淘汰赛', '半决赛', '季军赛', '决赛']
+LOGO_BASE = 'https://rm-static.djicdn.com/games-backend/'
+REPLAY_BASE = 'https://www.robomaster.com/zh-CN/resource/video/'
+
+# 战术数据与备注的文本片段
+TACTICAL_PHRASES = [
+    '开局直接抢占高地', '哨兵巡逻路线固定', '英雄吊射前哨站', '工程取矿速度很快', '步兵喜欢绕后',
+    '飞镖命中率一般', '雷达标记稳定', '无人机开局起飞支援', '经常在资源岛附近埋伏', '血量低时会回补给点',
+    '小陀螺转速快', '自瞄效果明显', '大符激活较慢', '后期会集中推进基地', '底盘偏软，容易被推',
+]
+IMAGE_DESCRIPTIONS = ['正面照', '侧面照', '发射机构', '底盘', '赛场截图']
+
+
+def zone_count(scale):
+    return max(1, int(round(ZONES_PER_SCALE * scale)))
+
+
+def build_season(scale, seed):
+    """生成赛季骨架：赛区 -> 小组 -> 队伍（学校名、队名、ID 全局唯一）"""
+    rng = random.Random(seed)
+    zones = []
+    team_seq = 0
+    for z in range(zone_count(scale)):
+        zone = {
+            'id': str(500 + z),
+            'name': f"{ZONE_NAMES[z % len(ZONE_NAMES)]}{z // len(ZONE_NAMES) + 1}",
+            # 每 8 个赛区中最后两个安排在 8 月（全国赛与复活赛），其余在 5 月
+            'start': datetime(2025, 8 if z % ZONES_PER_SCALE >= 6 else 5, 1 + (z % 5) * 5, 0, 30, tzinfo=timezone.utc),
+            'groups': [],
+        }
+        for g, group_name in enumerate(GROUP_NAMES):
+            teams = []
+            for position in range(TEAMS_PER_GROUP):
+                team_seq += 1
+                teams.append({
+                    'team_id': str(1000 + team_seq),
+                    'player_id': str(20000 + team_seq),
+                    'college': f'合成大学{team_seq:05d}',
+                    'name': f'战队{team_seq:05d}',
+                    'logo': f'{LOGO_BASE}{rng.getrandbits(64):016x}',
+                    'slot': f'{group_name}{position + 1}',
+                })
+            zone['groups'].append({'id': str(3000 + z * len(GROUP_NAMES) + g), 'name': group_name, 'teams': teams})
+        zones.append(zone)
+    return zones
+
+
+def robot_metrics(rng, robot_type):
+    metrics = {
+        'eaSmallHitRate': 0, 'eagHurt': 0.0, 'eaKDA': '0.0/0.0/0.0', 'eagKdaScore': 0.0,
+        'matchLargeEnergyActRoundsAvg': 0.0, 'gkDamage': 0.0, 'gKillCount': 0.0, 'eaBigHitRate': 0,
+        'eaSnipeCnt': 0, 'etDartOutpostCnt': 0, 'etDartFixedCnt': 0, 'etDartRDFixCnt': 0,
+        'etDartRDMoveCnt': 0, 'eaRadarMarkerTime': 0.0, 'eaRadarDebuffDmg': 0.0, 'eaExchangeEcon': 0.0,
+        'avgMineTime': 0.0, 'avgMineDiff': 0.0, 'avgShootNum': 0.0,
+    }
+    if robot_type in ('Infantry', 'Hero', 'Guard', 'Airplane'):
+        kills, deaths, assists = (round(rng.uniform(0, 3), 1) for _ in range(3))
+        metrics.update({
+            'eagHurt': round(rng.uniform(50, 900), 1),
+            'eaKDA': f'{kills}/{deaths}/{assists}',
+            'eagKdaScore': round((kills + assists) / max(1, deaths), 1),
+            'gkDamage': round(rng.uniform(0, 400), 1),
+            'gKillCount': round(rng.uniform(0, 2), 1),
+            'avgShootNum': round(rng.uniform(20, 400), 1),
+        })
+        if robot_type == 'Hero':
+            metrics['eaBigHitRate'] = round(rng.uniform(0, 60), 1)
+            metrics['eaSnipeCnt'] = rng.randint(0, 8)
+        else:
+            metrics['eaSmallHitRate'] = round(rng.uniform(5, 60), 1)
+        if robot_type == 'Infantry':
+            metrics['matchLargeEnergyActRoundsAvg'] = round(rng.uniform(0, 1), 2)
+    elif robot_type == 'Dart':
+        metrics.update({key: rng.randint(0, 4) for key in
+                        ('etDartOutpostCnt', 'etDartFixedCnt', 'etDartRDFixCnt', 'etDartRDMoveCnt')})
+    elif robot_type == 'Radar':
+        metrics['eaRadarMarkerTime'] = round(rng.uniform(0, 300), 1)
+        metrics['eaRadarDebuffDmg'] = round(rng.uniform(0, 30), 1)
+    elif robot_type == 'Sapper':
+        metrics['eaExchangeEcon'] = round(rng.uniform(0, 900), 1)
+        metrics['avgMineTime'] = round(rng.uniform(10, 90), 1)
+        metrics['avgMineDiff'] = round(rng.uniform(1, 4), 1)
+    return metrics
+
+
+def generate_robot_data(zones, rng):
+    robot_seq = 0
+    result = {'zones': []}
+    for zone in zones:
+        teams = [team for group in zone['groups'] for team in group['teams']][:ROBOT_TEAMS_PER_ZONE]
+        zone_teams = []
+        for team in teams:
+            robots = []
+            for robot_type in ROBOT_TYPES:
+                robot_seq += 1
+                robots.append(dict({'id': robot_seq, 'type': robot_type,
+                                    'robotNumber': ROBOT_TYPES.index(robot_type) + 1},
+                                   **robot_metrics(rng, robot_type)))
+            zone_teams.append({'id': int(team['team_id']), 'collegeName': team['college'],
+                               'collegeLogo': team['logo'], 'name': team['name'], 'robots': robots})
+        result['zones'].append({'zoneId': zone['id'], 'zoneName': zone['name'], 'teams': zone_teams})
+    return result
+
+
+def generate_group_rank(zones, rng):
+    result = {'zones': []}
+    for zone in zones:
+        groups = []
+        for group in zone['groups']:
+            players = []
+            for team in group['teams']:
+                wins = rng.randint(0, 4)
+                draws = rng.randint(0, 1)
+                losses = rng.randint(0, 4)
+                players.append([
+                    {'itemName': '战队', 'itemValue': {'collegeName': team['college'],
+                                                     'collegeLogo': team['logo'], 'teamName': team['name']}},
+                    {'itemName': '胜/平/负', 'itemValue': f'{wins}/{draws}/{losses}'},
+                    {'itemName': '胜场数', 'itemValue': wins},
+                    {'itemName': '对手分', 'itemValue': rng.randint(0, 12)},
+                    {'itemName': '局均总基地净胜血量', 'itemValue': rng.randint(-4000, 4000)},
+                    {'itemName': '局均总前哨站净胜血量', 'itemValue': rng.randint(-1500, 1500)},
+                    {'itemName': '局均全队总伤害血量', 'itemValue': rng.randint(1000, 12000)},
+                ])
+            groups.append({'groupName': f"{group['name']}组", 'groupPlayers': players})
+        result['zones'].append({'zoneName': zone['name'], 'zoneId': zone['id'], 'groups': groups})
+    return result
+
+
+def schedule_player(team, rank):
+    return {'id': team['player_id'], 'name': team['slot'], 'rank': rank, 'score': rank,
+            'teamId': team['team_id'],
+            'team': {'id': team['team_id'], 'name': team['name'], 'collegeLogo': team['logo'],
+                     'collegeName': team['college']}}
+
+
+def schedule_match(rng, match_id, side_ids, match_type, order, started_at, red, blue, group_id, slug=None):
+    done = rng.random() < 0.85
+    red_wins = rng.randint(0, 2) if done else 0
+    blue_wins = (2 - red_wins if red_wins < 2 else rng.randint(0, 1)) if done else 0
+
+    def side(side_id, team, rank):
+        return {'id': side_id, 'preparedStatus': 'TO_GAME_FIELD' if done else 'WAITING',
+                'fillSourceId': group_id, 'fillSourceType': 'Group' if slug else None,
+                'fillSourceNumber': rank if slug else None, 'fillStatus': 'DONE',
+                'playerId': team['player_id'], 'player': schedule_player(team, rank),
+                'updatedAt': (started_at - timedelta(minutes=10)).strftime('%Y-%m-%dT%H:%M:%SZ')}
+
+    return {
+        'id': str(match_id), 'groupId': None if slug else group_id, 'matchType': match_type,
+        'orderNumber': order, 'planGameCount': 3,
+        'planStartedAt': started_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'result': ('RED' if red_wins > blue_wins else 'BLUE') if done else None,
+        'slug': slug, 'slugName': str(order), 'status': 'DONE' if done else 'WAITING',
+        'winnerPlaceholdName': '胜者' if slug else None, 'loserPlaceholdName': '败者' if slug else None,
+        'blueSideId': side_ids[1], 'blueSideScore': blue_wins, 'blueSideWinGameCount': blue_wins,
+        'blueSide': side(side_ids[1], blue, rng.randint(1, TEAMS_PER_GROUP)),
+        'redSideId': side_ids[0], 'redSideScore': red_wins, 'redSideWinGameCount': red_wins,
+        'redSide': side(side_ids[0], red, rng.randint(1, TEAMS_PER_GROUP)),
+    }
+
+
+def generate_event(zones, rng, title, year_offset=0, first_match_id=1):
+    """生成一届赛事的 schedule 结构，返回 (event, 已完成比赛ID列表)"""
+    match_id = first_match_id
+    done_ids = []
+    zone_nodes = []
+    for zone in zones:
+        start = zone['start'].replace(year=zone['start'].year - year_offset)
+        dates = [(start + timedelta(days=d)).strftime('%Y-%m-%d') for d in range(5)]
+        group_nodes, group_matches, knockout_matches = [], [], []
+        order = 0
+        for group in zone['groups']:
+            group_nodes.append({'id': group['id'], 'name': group['name'], 'players': {'nodes': [
+                schedule_player(team, rank) for rank, team in enumerate(group['teams'], 1)]}})
+            for _ in range(GROUP_MATCHES_PER_GROUP):
+                order += 1
+                red, blue = rng.sample(group['teams'], 2)
+                started_at = start + timedelta(days=order % 4, minutes=40 * (order // 4))
+                group_matches.append(schedule_match(rng, match_id, (str(2 * match_id), str(2 * match_id + 1)),
+                                                    'GROUP', order, started_at, red, blue, group['id']))
+                match_id += 1
+        all_teams = [team for group in zone['groups'] for team in group['teams']]
+        for k in range(KNOCKOUT_MATCHES_PER_ZONE):
+            order += 1
+            red, blue = rng.sample(all_teams, 2)
+            started_at = start + timedelta(days=4, minutes=30 * k)
+            knockout_matches.append(schedule_match(rng, match_id, (str(2 * match_id), str(2 * match_id + 1)),
+                                                   'KNOCKOUT', order, started_at, red, blue,
+                                                   zone['groups'][k % len(zone['groups'])]['id'],
+                                                   slug=KNOCKOUT_SLUGS[min(k // 4, len(KNOCKOUT_SLUGS) - 1)]))
+            match_id += 1
+        done_ids.extend(m['id'] for m in group_matches + knockout_matches if m['status'] == 'DONE')
+        zone_nodes.append({'id': zone['id'], 'matchDates': dates, 'name': zone['name'], 'zoneType': 'GROUP_ZONE',
+                           'groups': {'nodes': group_nodes}, 'groupMatches': {'nodes': group_matches},
+                           'knockoutMatches': {'nodes': knockout_matches}})
+    return {'title': title, 'zones': {'nodes': zone_nodes}}, done_ids
+
+
+def generate_schedule(zones, rng):
+    event, done_ids = generate_event(zones, rng, 'RoboMaster 2025 超级对抗赛')
+    # 上一届赛事与官方数据一样放在 last_event 中（应用不读取，但占据相近的文件大小与解析耗时）
+    last_event, _ = generate_event(zones, rng, 'RoboMaster 2024 超级对抗赛', year_offset=1,
+                                   first_match_id=10 ** 7)
+    return {'data': {'event': event, 'last_event': last_event}}, done_ids
+
+
+def generate_simple_cms(done_ids, rng):
+    items = []
+    for n, match_id in enumerate(done_ids, 1):
+        items.append({'id': n, 'title': f'比赛回放 {match_id}', 'is_active': rng.random() < 0.95,
+                      'content': {'match_id': match_id, 'main_remote_url': f'{REPLAY_BASE}{match_id}'}})
+    return {'simple_cms': items}
+
+
+def write_feeds(folder, scale=1, seed=2025):
+    """在 folder 中写入四个数据源文件，返回各文件的字节数"""
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(seed)
+    zones = build_season(scale, seed)
+    schedule, done_ids = generate_schedule(zones, rng)
+    feeds = {
+        'robot_data.json': generate_robot_data(zones, rng),
+        'group_rank_info.json': generate_group_rank(zones, rng),
+        'schedule.json': schedule,
+        'simple_cms.json': generate_simple_cms(done_ids, rng),
+    }
+    sizes = {}
+    for filename, content in feeds.items():
+        body = json.dumps(content, ensure_ascii=False).encode('utf-8')
+        with open(os.path.join(folder, filename), 'wb') as f:
+            f.write(body)
+        sizes[filename] = len(body)
+    return sizes
+
+
+def populate_database(rmintel, seed=2025, fill_ratio=0.4, images_per_team=2):
+    """
+    通过 import_teams_from_robot_data 导入数据源中的队伍，再按 fill_ratio 填写战术数据，
+    并为每支队伍写入备注与 images_per_team 条图片记录（只写数据库，不生成图片文件）。
+    需要在应用上下文中调用，返回各表的行数。
+    """
+    rng = random.Random(seed)
+    db = rmintel.db
+    rmintel.import_teams_from_robot_data()
+
+    table = rmintel.TacticalData.__table__
+    updates = [{'data_id': data_id, 'content': '，'.join(rng.sample(TACTICAL_PHRASES, rng.randint(1, 3)))}
+               for (data_id,) in db.session.query(rmintel.TacticalData.id) if rng.random() < fill_ratio]
+    if updates:
+        db.session.execute(table.update().where(table.c.id == db.bindparam('data_id'))
+                           .values(content=db.bindparam('content')), updates)
+
+    team_ids = [team_id for (team_id,) in db.session.query(rmintel.Team.id)]
+    team_table = rmintel.Team.__table__
+    db.session.execute(team_table.update().where(team_table.c.id == db.bindparam('team_id'))
+                       .values(comment=db.bindparam('comment')),
+                       [{'team_id': team_id, 'comment': rng.choice(TACTICAL_PHRASES)} for team_id in team_ids])
+    rmintel.refresh_missing_counts()
+
+    categories = [category for category, _ in rmintel.TACTICAL_CATEGORIES]
+    now = datetime.now(timezone.utc)
+    image_rows = [{'team_id': team_id, 'robot_type': rng.choice(categories),
+                   'filename': f'{team_id}_{n}_synthetic.jpg', 'description': rng.choice(IMAGE_DESCRIPTIONS),
+                   'uploaded_at': now}
+                  for team_id in team_ids for n in range(images_per_team)]
+    if image_rows:
+        db.session.execute(rmintel.TeamImage.__table__.insert(), image_rows)
+    db.session.commit()
+    return {
+        'teams': len(team_ids),
+        'tactical_data': db.session.query(rmintel.TacticalData).count(),
+        'tactical_data_filled': len(updates),
+        'team_images': len(image_rows),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='生成合成赛季数据源文件')
+    parser.add_argument('--scale', type=float, default=1, help='相对真实赛季的规模倍数')
+    parser.add_argument('--seed', type=int, default=2025)
+    parser.add_argument('--out', required=True, help='输出目录')
+    args = parser.parse_args()
+    for filename, size in write_feeds(args.out, args.scale, args.seed).items():
+        print(f"{filename}: {size / 1024:.1f} KB")
@@ -0,0 +1,22 @@
+"""
+gunicorn 多进程部署配置: RMINTEL_LOGIN_PASSWORD=password gunicorn -c gunicorn.conf.py wsgi:app
+
+- preload_app: 主进程加载应用时完成建表、迁移与同步，之后再 fork 出工作进程
+- 后台下载线程不能在 fork 前启动，由各工作进程启动后通过文件锁选出唯一的运行者
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('RMINTEL_BIND', '0.0.0.0:6060')
+workers = int(os.getenv('RMINTEL_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.getenv('RMINTEL_THREADS', '4'))
+preload_app = True
+timeout = 60
+
+# 主进程加载应用时不启动后台任务
+os.environ['RMINTEL_BACKGROUND_TASKS'] = '0'
+
+
+def post_worker_init(worker):
+    from app import start_background_tasks
+    start_background_tasks()
@@ -0,0 +1,10 @@
+"""
+WSGI 入口，供多进程 WSGI 服务器加载，例如:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+数据库初始化在加载本模块时执行；后台下载任务由文件锁选出唯一的进程运行。
+"""
+from app import create_app
+
+app = create_app()